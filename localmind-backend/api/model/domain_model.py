@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 from uuid import UUID
 from pydantic import BaseModel, ConfigDict
 
@@ -20,4 +21,20 @@ class Message(BaseModel):
     text : str
     created_at : datetime
     sender : MessageSender
+    truncated : bool = False
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ConversationPage(BaseModel):
+    items : list[Conversation]
+    # Pass back as `cursor` for the next page; None on the last page
+    next_cursor : Optional[str] = None
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MessagePage(BaseModel):
+    # Always oldest first
+    items : list[Message]
+    # Pass back as the same `before`/`after` parameter to continue in that direction; None when there is no more
+    next_cursor : Optional[str] = None
     model_config = ConfigDict(from_attributes=True)
@@ -1,3 +1,5 @@
+from uuid import UUID
+
 from pydantic import BaseModel
 from db.schema.enums import ConversationType
 
@@ -9,3 +11,6 @@ class CreateConversationRequest(BaseModel):
 
 class MessageRequest(BaseModel):
     text: str
+
+class BulkDeleteRequest(BaseModel):
+    ids : list[UUID]
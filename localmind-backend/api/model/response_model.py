@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from uuid import UUID
-from db.schema.enums import ConversationType
+from db.schema.enums import ConversationType, TrainingJobStatus
 from pydantic import BaseModel, ConfigDict
 
 
@@ -29,3 +29,35 @@ class DocumentGroupResponse(BaseModel):
     # # This includes the list of documents in the response
     # document: List[DocumentRead] = []
 
+
+class StageStatsResponse(BaseModel):
+    items: int
+    chunks: int
+    throughput: float
+    busy_seconds: float
+    wait_seconds: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TrainingJobResponse(BaseModel):
+    id: str
+    group_id: str
+    status: TrainingJobStatus
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    documents_total: int
+    documents_processed: int
+    chunks_processed: int
+    throughput: float
+    eta_seconds: Optional[float] = None
+    errors: List[str] = []
+    stages: Dict[str, StageStatsResponse] = {}
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BulkDeleteResponse(BaseModel):
+    # The requested IDs that existed and were deleted
+    deleted: List[UUID]
@@ -1,36 +1,62 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from starlette.responses import StreamingResponse
 
 import uuid
-from typing import List
+from typing import List, Optional
 from api.model.request_model import CreateConversationRequest, MessageRequest
-from api.model.domain_model import Message
+from api.model.domain_model import MessagePage
 from api.service.chat_service import ChatService
 from api.service.conversation_service import ConversationService
+from api.service.resource_registry import get_resources
 from db.database_adapter import get_db
 
 
 router = APIRouter()
 
-@router.post("/{conversation_id}/all", response_model=List[Message])
-async def get_all_messages_post(conversation_id: str, db=Depends(get_db)):
-    service = ChatService(db)
-    return service.get_all_messages(conversation_id)
+@router.post("/{conversation_id}/all", response_model=MessagePage)
+async def get_all_messages_post(conversation_id: str, limit: Optional[int] = None, before: Optional[str] = None,
+                                after: Optional[str] = None, db=Depends(get_db), resources=Depends(get_resources)):
+    service = ChatService(db, resources)
+    return await service.get_message_page(conversation_id, limit, before, after)
+
+@router.get("/{conversation_id}/messages/{message_id}/stream")
+async def resume_message_stream(conversation_id: str, message_id: str, http_request: Request, offset: int = 0,
+                                db=Depends(get_db), resources=Depends(get_resources)):
+    service = ChatService(db, resources)
+    # An SSE client reconnecting sends the id of the last event it got, which is its offset
+    last_event_id = http_request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        offset = int(last_event_id)
+    return StreamingResponse(
+        await service.open_resume_stream(conversation_id, message_id, offset, http_request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
 
 @router.post("/{conversation_id}/message",)
-async def get_response(conversation_id: str, request: MessageRequest, db=Depends(get_db)):
-    service = ChatService(db)
-    
-    # Create DB records for the messages
-    user_msg_id, assistant_msg_id = service.create_chat_messages(conversation_id, request.text)
+async def get_response(conversation_id: str, request: MessageRequest, http_request: Request, db=Depends(get_db),
+                       resources=Depends(get_resources)):
+    service = ChatService(db, resources)
+
+    # Reject before touching the DB when the generation queue is full (429)
+    ticket = service.admit(conversation_id)
+    try:
+        # Create DB records for the messages
+        user_msg_id, assistant_msg_id = await service.create_chat_messages(conversation_id, request.text)
+    except Exception:
+        ticket.release()
+        raise
     
+    # The producer owns the ticket from here on, whether or not the client ever reads the body
+    stream = service.open_chat_stream(conversation_id, request.text, assistant_msg_id, ticket,
+                                      is_disconnected=http_request.is_disconnected)
     return StreamingResponse(
-        service.get_chat_stream(conversation_id, request.text, assistant_msg_id),
+        stream,
         media_type="text/plain",
         headers={
             "x-user-message-id": user_msg_id,
             "x-assistant-message-id": assistant_msg_id,
-            "Access-Control-Expose-Headers": "x-user-message-id, x-assistant-message-id"
+            "x-queue-position": str(ticket.position),
+            "Access-Control-Expose-Headers": "x-user-message-id, x-assistant-message-id, x-queue-position"
         }
     )
-
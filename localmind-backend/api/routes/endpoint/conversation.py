@@ -1,20 +1,23 @@
 from mailbox import Message
+from typing import Optional
 
 from fastapi import APIRouter, Depends
 
-from api.model.request_model import CreateConversationRequest
+from api.model.request_model import BulkDeleteRequest, CreateConversationRequest
+from api.model.response_model import BulkDeleteResponse
 from db.database_adapter import get_db
 from api.service.conversation_service import ConversationService
-from api.model.domain_model import Conversation
+from api.service.resource_registry import get_resources
+from api.model.domain_model import Conversation, ConversationPage
 
 
 router = APIRouter()
 
 
 @router.get("/{conversation_id}/messages")
-async def get_messages(conversation_id: str, db=Depends(get_db)):
-    service = ConversationService(db)
-    return service.get_messages(conversation_id)
+async def get_messages(conversation_id: str, db=Depends(get_db), resources=Depends(get_resources)):
+    service = ConversationService(db, resources)
+    return await service.get_messages(conversation_id)
 
 @router.get("/{conversation_id}/message")
 async def temp(conversation_id):
@@ -22,9 +25,14 @@ async def temp(conversation_id):
     return ""
 
 @router.delete("/{conversation_id}")
-async def delete_conversation(conversation_id: str, db=Depends(get_db)):
-    service = ConversationService(db)
-    return service.delete_conversation(conversation_id)
+async def delete_conversation(conversation_id: str, db=Depends(get_db), resources=Depends(get_resources)):
+    service = ConversationService(db, resources)
+    return await service.delete_conversation(conversation_id)
+
+@router.post("/bulk_delete", response_model=BulkDeleteResponse)
+async def delete_conversations(request: BulkDeleteRequest, db=Depends(get_db), resources=Depends(get_resources)):
+    service = ConversationService(db, resources)
+    return BulkDeleteResponse(deleted=await service.delete_conversations(request.ids))
 
 @router.get("/{conversation_id}")
 async def temp2(conversation_id):
@@ -32,15 +40,16 @@ async def temp2(conversation_id):
     return ""
 
 @router.post("/new")
-async def create_conversation(request : CreateConversationRequest,db=Depends(get_db)):
-    service = ConversationService(db)
-    conv = service.create_conversation(request)
+async def create_conversation(request : CreateConversationRequest,db=Depends(get_db),resources=Depends(get_resources)):
+    service = ConversationService(db, resources)
+    conv = await service.create_conversation(request)
     return Conversation.model_validate(conv)
 
 
-@router.get("/")
-async def get_all_conversations(db=Depends(get_db)):
-    service = ConversationService(db)
-    return service.get_all_conversations()
+@router.get("/", response_model=ConversationPage)
+async def get_all_conversations(limit: Optional[int] = None, cursor: Optional[str] = None, db=Depends(get_db),
+                                resources=Depends(get_resources)):
+    service = ConversationService(db, resources)
+    return await service.get_conversation_page(limit, cursor)
 
 
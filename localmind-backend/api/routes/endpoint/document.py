@@ -2,19 +2,28 @@ from uuid import UUID
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 
+from api.model.request_model import BulkDeleteRequest
+from api.model.response_model import BulkDeleteResponse
 from api.service.document_service import DocumentService
+from api.service.resource_registry import get_resources
 from db.database_adapter import get_db
 
 router = APIRouter()
 
 
 @router.post("/{group_id}/upload")
-async def upload_document(group_id:str,file: UploadFile = File(...),db=Depends(get_db)):
-    service = DocumentService(db)
+async def upload_document(group_id:str,file: UploadFile = File(...),db=Depends(get_db),resources=Depends(get_resources)):
+    service = DocumentService(db, resources)
     await service.create_document(UUID(group_id),file)
 
 
+@router.post("/bulk_delete", response_model=BulkDeleteResponse)
+async def delete_documents(request: BulkDeleteRequest,db=Depends(get_db),resources=Depends(get_resources)):
+    service = DocumentService(db, resources)
+    return BulkDeleteResponse(deleted=await service.delete_documents(request.ids))
+
+
 @router.delete("/{document_id}")
-async def delete_document(document_id:str,db=Depends(get_db)):
-    service = DocumentService(db)
-    service.delete_document(document_id)
+async def delete_document(document_id:str,db=Depends(get_db),resources=Depends(get_resources)):
+    service = DocumentService(db, resources)
+    await service.delete_document(document_id)
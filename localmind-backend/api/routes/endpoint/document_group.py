@@ -1,11 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 
-from api.model.response_model import DocumentGroupResponse
+from api.model.response_model import DocumentGroupResponse, TrainingJobResponse
 from api.service.document_group_service import DocumentGroupService
 from api.service.document_service import DocumentService
 from db.database_adapter import get_db
 from db.schema.document_group import DocumentGroupORM
-from api.service.model_train_service import ModelTrainService
+from api.service.resource_registry import get_resources
 
 router = APIRouter()
 
@@ -13,21 +13,32 @@ router = APIRouter()
 @router.get("/groups")
 async def get_document_groups(db=Depends(get_db)):
     service = DocumentGroupService(db)
-    return service.get_all_document_groups()
+    return await service.get_all_document_groups()
 
 @router.get("/{group_id}/documents")
-async def get_document_group(group_id: str,db=Depends(get_db)):
-    service = DocumentService(db)
-    return service.get_document_by_group(group_id)
+async def get_document_group(group_id: str,db=Depends(get_db),resources=Depends(get_resources)):
+    service = DocumentService(db, resources)
+    return await service.get_document_by_group(group_id)
 
 
 @router.post("/new/{group_name}", response_model=DocumentGroupResponse)
 async def create_document_group(group_name: str,db=Depends(get_db)):
     service = DocumentGroupService(db)
-    return service.create_document_group(group_name)
+    return await service.create_document_group(group_name)
 
 
-@router.post("/{group_id}/train")
-async def train_document_group(group_id: str,db=Depends(get_db)):
-    service = ModelTrainService(db)
-    return await service.train_model(group_id)
+@router.post("/{group_id}/train", response_model=TrainingJobResponse, status_code=202)
+async def train_document_group(group_id: str,db=Depends(get_db),resources=Depends(get_resources)):
+    # Training an unknown group would create an empty Chroma collection for it
+    if not await DocumentGroupService(db).get_document_group(group_id):
+        raise HTTPException(status_code=404, detail="Document group not found")
+    job = resources.training_jobs.submit(group_id)
+    return TrainingJobResponse.model_validate(job)
+
+
+@router.get("/jobs/{job_id}", response_model=TrainingJobResponse)
+async def get_training_job(job_id: str,resources=Depends(get_resources)):
+    job = resources.training_jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return TrainingJobResponse.model_validate(job)
@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Depends
+
+from api.service.resource_registry import get_resources
+
+router = APIRouter()
+
+
+@router.get("/")
+async def get_metrics(resources=Depends(get_resources)):
+    return resources.metrics()
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from api.routes.endpoint import conversation,document,document_group,test,chat
+from api.routes.endpoint import conversation,document,document_group,test,chat,metrics
 
 api_router = APIRouter()
 
@@ -22,6 +22,10 @@ api_router.include_router(
 api_router.include_router(
     chat.router, prefix="/chat", tags=["chat"]
 )
+
+api_router.include_router(
+    metrics.router, prefix="/metrics", tags=["metrics"]
+)
 # api_router.include_router(
 #     query.router,
 #     prefix="/query",
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter.
+    The limit grows by about one slot per round of successful calls while latency stays
+    within latency_tolerance x the baseline, and is halved on an error or a latency spike
+    (at most once per observed latency, so one burst of failures counts as one signal).
+    """
+
+    def __init__(self, name: str, initial: int, minimum: int, maximum: int,
+                 latency_tolerance: float = 2.0, backoff: float = 0.5):
+        self.name = name
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.latency_tolerance = latency_tolerance
+        self.backoff = backoff
+        self.in_flight = 0
+        self.baseline_latency = None
+        self.recent_latency = None
+        self.successes = 0
+        self.failures = 0
+        self.last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation; give it back
+                self.in_flight -= 1
+                self._wake()
+            else:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, latency: float, ok: bool):
+        self.in_flight -= 1
+        if ok:
+            self._on_success(latency)
+        else:
+            self._on_failure(latency, "error")
+        self._wake()
+
+    def _on_success(self, latency: float):
+        self.successes += 1
+        self.recent_latency = latency if self.recent_latency is None else 0.7 * self.recent_latency + 0.3 * latency
+
+        if self.baseline_latency is None:
+            self.baseline_latency = latency
+        elif latency > self.baseline_latency * self.latency_tolerance:
+            self._on_failure(latency, "latency spike")
+            return
+        else:
+            # The baseline follows latency slowly, so gradual drift is accepted but spikes are not
+            self.baseline_latency = 0.95 * self.baseline_latency + 0.05 * latency
+
+        if self.limit < self.maximum:
+            previous = int(self.limit)
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if int(self.limit) != previous:
+                logger.info(f"{self.name} concurrency limit {previous} -> {int(self.limit)} "
+                            f"(latency {latency:.2f}s, baseline {self.baseline_latency:.2f}s)")
+
+    def _on_failure(self, latency: float, reason: str):
+        if reason == "error":
+            self.failures += 1
+        now = time.monotonic()
+        if now - self.last_decrease < (self.recent_latency or latency):
+            return
+        self.last_decrease = now
+        previous = int(self.limit)
+        self.limit = max(self.minimum, self.limit * self.backoff)
+        logger.warning(f"{self.name} concurrency limit {previous} -> {int(self.limit)} after {reason} "
+                       f"(latency {latency:.2f}s, baseline {self.baseline_latency or 0:.2f}s)")
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": len(self._waiters),
+            "baseline_latency": self.baseline_latency,
+            "recent_latency": self.recent_latency,
+            "successes": self.successes,
+            "failures": self.failures,
+        }
@@ -1,65 +1,233 @@
 import asyncio
+import json
+import logging
+import time
+from fastapi import HTTPException
 from starlette.responses import StreamingResponse
 from api.routes.endpoint.conversation import router
+from api.config import settings
 from api.service.llm_service import LLMService
 from api.service.message_service import MessageService
 from api.service.conversation_service import ConversationService
-from api.model.domain_model import Message
+from api.model.domain_model import MessagePage
 from db.schema.enums import MessageSender,ConversationType
 from api.service.search_service import SearchService
+from api.service.stage_timer import StageTimer
+from api.service.context_packer import pack_context
+from api.service.history_manager import HistoryManager
+from api.service.live_stream import LiveStream
+from api.service.pagination import decode_cursor, encode_cursor, page_size
+from db.database_adapter import SessionLocal
+from db.repository.message_repo import MessageRepo
+
+logger = logging.getLogger(__name__)
 
 class ChatService:
-    def __init__(self, db):
-        self.llm_service = LLMService(db)
+    def __init__(self, db, resources):
+        self.llm_service = LLMService(db, resources)
         self.message_service = MessageService(db)
-        self.conversation_service = ConversationService(db)
-        self.search_service = SearchService(db)
+        self.search_service = SearchService(db, resources)
+        self.history_manager = HistoryManager(resources)
+        self.resources = resources
+        self.live_streams = resources.live_streams
 
-    def create_chat_messages(self, conversation_id: str, message_text: str):
+    async def create_chat_messages(self, conversation_id: str, message_text: str):
         # Create user message
-        user_message = self.message_service.create_message(conversation_id, message_text, MessageSender.USER)
+        user_message = await self.message_service.create_message(conversation_id, message_text, MessageSender.USER)
         # Create placeholder assistant message
-        assistant_message = self.message_service.create_message(conversation_id, "", MessageSender.ASSISTANT)
+        assistant_message = await self.message_service.create_message(conversation_id, "", MessageSender.ASSISTANT)
         return str(user_message.id), str(assistant_message.id)
 
-    def get_all_messages(self, conversation_id: str):
-        messages = self.message_service.get_message_by_conversation(conversation_id)
-        result = []
-        for msg in messages:
-            result.append(Message.model_validate(msg))
-        return result
+    async def get_message_page(self, conversation_id: str, limit: int = None, before: str = None,
+                               after: str = None) -> MessagePage:
+        """
+        One page of a conversation's messages. Without a cursor it returns the latest `limit` messages;
+        `before` pages back through older ones and `after` forward through newer ones.
+        """
+        if before and after:
+            raise HTTPException(status_code=400, detail="Pass either before or after, not both")
+        limit = page_size(limit)
+        # One extra row tells whether there is another page
+        messages = await self.message_service.get_message_page(
+            conversation_id, limit + 1,
+            before=decode_cursor(before) if before else None,
+            after=decode_cursor(after) if after else None
+        )
+        next_cursor = None
+        if len(messages) > limit:
+            messages = messages[:limit]
+            next_cursor = encode_cursor(messages[-1].created_at, messages[-1].id)
+        if not after:
+            messages.reverse()
+        return MessagePage.model_validate({"items": messages, "next_cursor": next_cursor}, from_attributes=True)
+
+
+    def admit(self, conversation_id: str):
+        return self.llm_service.admit(conversation_id)
+
+    def open_chat_stream(self, conversation_id: str, message: str, assistant_message_id: str, ticket=None,
+                         is_disconnected=None):
+        """
+        Starts the answer in a separate producer task owned by the app and returns a generator that
+        streams it. The producer takes the ticket over straight away, so the slot is freed even if
+        the response body is never iterated. The client reads the answer as a follower of its live
+        stream, so it can drop and resume (see open_resume_stream). The producer is cancelled once
+        nobody has followed the answer for STREAM_RESUME_GRACE_SECONDS, which aborts retrieval and
+        closes the upstream Ollama stream.
+        """
+        live = self.live_streams.open(assistant_message_id)
+        producer = self.resources.spawn(
+            self._produce(conversation_id, message, assistant_message_id, ticket, live),
+            key=f"stream:{assistant_message_id}"
+        )
+        if not producer:
+            # Shutting down: the answer is never generated
+            if ticket:
+                ticket.release()
+            live.finish(truncated=True)
+            self.live_streams.close(assistant_message_id)
+        return self._follow_stream(live, is_disconnected)
+
+    @staticmethod
+    async def _follow_stream(live: LiveStream, is_disconnected=None):
+        async for _, text in live.follow(0, is_disconnected):
+            yield text
+        if live.error:
+            raise live.error
+
+    async def open_resume_stream(self, conversation_id: str, message_id: str, offset: int = 0, is_disconnected=None):
+        """
+        Returns an SSE generator replaying an assistant answer from `offset` (characters), then
+        following it live if it is still being generated. Event ids are the offset after each event,
+        so a client reconnecting with Last-Event-ID picks up exactly where it stopped.
+        """
+        message = await self.message_service.get_message_by_id(message_id)
+        if not message or str(message.conversation_id) != str(conversation_id):
+            raise HTTPException(status_code=404, detail="Message not found")
+        return self._resume_stream(message, max(0, offset), is_disconnected)
+
+    async def _resume_stream(self, message, offset: int, is_disconnected=None):
+        live = self.live_streams.get(message.id)
+        if live:
+            async for start, text in live.follow(offset, is_disconnected):
+                yield self._sse(start + len(text), text)
+            truncated = live.truncated
+        else:
+            # Finished (or generated by another worker): replay what was saved
+            if offset < len(message.text):
+                yield self._sse(len(message.text), message.text[offset:])
+            truncated = message.truncated
+        yield f"event: end\ndata: {json.dumps({'truncated': truncated})}\n\n"
 
+    @staticmethod
+    def _sse(event_id: int, text: str) -> str:
+        data = "".join(f"data: {line}\n" for line in text.split("\n"))
+        return f"id: {event_id}\n{data}\n"
 
-    async def get_chat_stream(self, conversation_id: str, message: str, assistant_message_id: str):
-        full_response = ""
-        db_messages = self.message_service.get_message_by_conversation(conversation_id)
+    async def _produce(self, conversation_id: str, message: str, assistant_message_id: str, ticket,
+                       live: LiveStream):
+        watcher = asyncio.create_task(self._cancel_when_abandoned(live, asyncio.current_task()))
+        completed = False
+        error = None
+        flushed_at = time.monotonic()
+        unflushed_bytes = 0
+        try:
+            async for chunk in self._generate(conversation_id, message, assistant_message_id, ticket):
+                live.append(chunk)
+                unflushed_bytes += len(chunk.encode())
+                # Persist progress in batches, not per token, so a crash loses at most one interval
+                if (unflushed_bytes >= settings.STREAM_FLUSH_BYTES
+                        or time.monotonic() - flushed_at >= settings.STREAM_FLUSH_INTERVAL):
+                    await self._save_answer(assistant_message_id, live.text, True)
+                    flushed_at = time.monotonic()
+                    unflushed_bytes = 0
+            completed = True
+        except asyncio.CancelledError:
+            logger.info(f"Chat stream for conversation {conversation_id} abandoned, saving partial answer")
+        except Exception as e:
+            error = e
+        finally:
+            watcher.cancel()
+            if ticket:
+                ticket.release()
+            try:
+                # Shielded: a second cancellation (e.g. shutdown) must not lose the final write
+                await asyncio.shield(self._save_answer(assistant_message_id, live.text, not completed))
+            finally:
+                live.finish(truncated=not completed, error=error)
+                self.live_streams.close(assistant_message_id)
+                self.history_manager.schedule_summary_update(conversation_id)
+
+    @staticmethod
+    async def _cancel_when_abandoned(live: LiveStream, producer: asyncio.Task):
+        idle = 0.0
+        while not producer.done():
+            await asyncio.sleep(settings.DISCONNECT_POLL_INTERVAL)
+            idle = 0.0 if live.followers else idle + settings.DISCONNECT_POLL_INTERVAL
+            if idle > settings.STREAM_RESUME_GRACE_SECONDS:
+                producer.cancel()
+                return
+
+    @staticmethod
+    async def _save_answer(message_id: str, text: str, truncated: bool):
+        # The producer can outlive the request, so it writes through its own session
+        async with SessionLocal() as db:
+            await MessageRepo(db).update_message(message_id, text, truncated)
+
+    async def _generate(self, conversation_id: str, message: str, assistant_message_id: str, ticket=None):
+        timer = StageTimer()
         context_text = ""
-        conversation = self.conversation_service.get_conversation_by_id(conversation_id)
-        instruction = ""
+        # The producer outlives the request, so it reads through its own session too,
+        # released before retrieval and generation
+        async with SessionLocal() as db:
+            with timer.stage("conversation"):
+                conversation = await ConversationService(db, self.resources).get_conversation_by_id(conversation_id)
+            use_rag = conversation.conv_type != ConversationType.GENERAL
+
+            # The DB lookups share one session, so they run one after another
+            # while the query is embedded concurrently
+            lookups = self._load_turn_data(db, conversation_id, conversation.summarized_until, use_rag, timer)
+            if use_rag:
+                (db_messages, group_ids), query_embedding = await asyncio.gather(
+                    lookups, self._embed_query(message, timer)
+                )
+            else:
+                db_messages, group_ids = await lookups
 
-        if conversation.conv_type != ConversationType.GENERAL:
-            search_result = await self.search_service.search(message, conversation_id)
+        if use_rag and group_ids:
+            search_result = await self.search_service.retrieve(
+                message, query_embedding, group_ids, timer=timer
+            )
             if search_result:
-                # Format context clearly for the LLM
-                context_texts = [f"Source: {res.get('metadata', {}).get('source', 'Unknown')}\n{res.get('content', '')}" for res in search_result]
-                context_text = "\n\n---\n\n".join(context_texts)
+                # Merge overlapping chunks and fit them into the context token budget
+                context_text = pack_context(search_result)
                 print(f"RAG Context found: {len(search_result)} chunks")
 
-        # Ensure chronological order
-        db_messages.sort(key=lambda x: x.created_at)
-        
-        history = []
-        for msg in db_messages:
-            role = "user" if msg.sender == MessageSender.USER else "assistant"
-            if str(msg.id) == assistant_message_id:
-                continue
-            history.append({"role": role, "content": msg.text})
-            
+        # Only the newest turns go verbatim; older ones are covered by the rolling summary
+        history = self.history_manager.build_history(db_messages, skip_message_id=assistant_message_id)
+
         # Pass context to LLM service (we need to update LLMService to handle this)
-        async for chunk in self.llm_service.get_result(message,conversation.conv_type, history, context=context_text):
-            full_response += chunk
+        first_token = True
+        generation_started = timer.elapsed()
+        async for chunk in self.llm_service.get_result(message,conversation.conv_type, history, context=context_text,
+                                                         summary=conversation.summary, ticket=ticket):
+            if first_token:
+                first_token = False
+                timer.stages["llm_first_token"] = timer.elapsed() - generation_started
+                logger.info(f"TTFT {timer.elapsed():.3f}s for conversation {conversation_id}: {timer.summary()}")
             yield chunk
-        
-        # After streaming completes, update the assistant message in the DB
-        if assistant_message_id:
-            self.message_service.update_message(assistant_message_id, text=full_response)
\ No newline at end of file
+
+    async def _load_turn_data(self, db, conversation_id: str, summarized_until, use_rag: bool, timer: StageTimer):
+        with timer.stage("messages"):
+            db_messages = await MessageService(db).get_recent_messages(
+                conversation_id, HistoryManager.window_limit(), after=summarized_until
+            )
+        group_ids = []
+        if use_rag:
+            with timer.stage("document_groups"):
+                group_ids = await SearchService(db, self.resources).get_group_ids(conversation_id)
+        return db_messages, group_ids
+
+    async def _embed_query(self, message: str, timer: StageTimer):
+        with timer.stage("query_embedding"):
+            return await self.search_service.embedding_service.embed(message)
@@ -0,0 +1,99 @@
+from api.config import settings
+
+SEPARATOR = "\n\n---\n\n"
+
+
+def estimate_tokens(text: str) -> int:
+    # Rough but tokenizer-free: about CONTEXT_CHARS_PER_TOKEN characters per token
+    return (len(text) + settings.CONTEXT_CHARS_PER_TOKEN - 1) // settings.CONTEXT_CHARS_PER_TOKEN
+
+
+class _Passage:
+    def __init__(self, rank: int, source: str, document_id, text: str, start: int | None, end: int | None):
+        self.rank = rank
+        self.source = source
+        self.document_id = document_id
+        self.text = text
+        self.start = start
+        self.end = end
+
+    def absorb(self, other: "_Passage"):
+        """Appends a later passage of the same document, dropping the text both cover."""
+        if other.end > self.end:
+            if other.start < self.end:
+                self.text += other.text[self.end - other.start:]
+            else:
+                self.text += " " + other.text
+            self.end = other.end
+        self.rank = min(self.rank, other.rank)
+
+
+def pack_context(search_results: list[dict], token_budget: int = None) -> str:
+    """
+    Builds the LLM context from ranked search results.
+    Chunks of the same document that overlap or touch (by their start/end offsets) are merged
+    into one passage without the repeated overlap, exact duplicates are dropped, and passages are
+    added in rank order until the token budget is used up.
+    """
+    token_budget = settings.CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+    passages = _merge(_to_passages(search_results))
+    passages.sort(key=lambda passage: passage.rank)
+
+    packed = []
+    remaining = token_budget
+    for passage in passages:
+        block = f"Source: {passage.source}\n{passage.text}"
+        cost = estimate_tokens(block) + estimate_tokens(SEPARATOR)
+        if cost > remaining:
+            # Keep the head of the passage if a useful amount still fits
+            if remaining >= settings.CONTEXT_MIN_PASSAGE_TOKENS:
+                limit = remaining * settings.CONTEXT_CHARS_PER_TOKEN - len(SEPARATOR)
+                cut = block.rfind(" ", 0, limit)
+                packed.append(block[:cut if cut > 0 else limit])
+            break
+        packed.append(block)
+        remaining -= cost
+    return SEPARATOR.join(packed)
+
+
+def _to_passages(search_results: list[dict]) -> list[_Passage]:
+    passages = []
+    seen = set()
+    for rank, result in enumerate(search_results):
+        text = result.get("content", "")
+        metadata = result.get("metadata") or {}
+        document_id = metadata.get("document_id")
+        if not text or (document_id, text) in seen:
+            continue
+        seen.add((document_id, text))
+        passages.append(_Passage(
+            rank,
+            metadata.get("source", "Unknown"),
+            document_id,
+            text,
+            metadata.get("start"),
+            metadata.get("end")
+        ))
+    return passages
+
+
+def _merge(passages: list[_Passage]) -> list[_Passage]:
+    # Chunks indexed before offsets were stored can't be merged and are kept as they are
+    merged, located = [], []
+    for passage in passages:
+        if passage.document_id is None or passage.start is None or passage.end is None:
+            merged.append(passage)
+        else:
+            located.append(passage)
+
+    located.sort(key=lambda p: (str(p.document_id), p.start))
+    current = None
+    for passage in located:
+        # Adjacent chunks are separated by at most the whitespace the chunker stripped
+        if (current and passage.document_id == current.document_id
+                and passage.start <= current.end + settings.CONTEXT_MERGE_GAP):
+            current.absorb(passage)
+        else:
+            current = passage
+            merged.append(current)
+    return merged
@@ -0,0 +1,47 @@
+import time
+from collections import OrderedDict
+from uuid import UUID
+
+
+class ConversationGroupCache:
+    """
+    Per-conversation LRU cache of the document group IDs retrieval searches.
+    Entries are dropped when a conversation's links change and the whole cache is cleared
+    when documents are uploaded or deleted (a group only counts once it has documents).
+    The TTL bounds staleness when another worker made the change.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[str, tuple[float, list[UUID]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, conversation_id) -> list[UUID] | None:
+        key = str(conversation_id)
+        entry = self.entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry:
+            del self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, conversation_id, group_ids: list[UUID]):
+        key = str(conversation_id)
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, group_ids)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, conversation_id):
+        self.entries.pop(str(conversation_id), None)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
@@ -1,53 +1,71 @@
-from api.model.domain_model import Conversation
+from api.model.domain_model import ConversationPage
 from api.model.request_model import CreateConversationRequest
+from api.service.pagination import decode_cursor, encode_cursor, page_size
 from db.repository.conversation_repo import ConversationRepo
 
 
 class ConversationService:
-    def __init__(self,db):
+    def __init__(self,db,resources):
         self.conversation_repo = ConversationRepo(db)
+        self.group_cache = resources.conversation_group_cache
 
     # def get_all_document_groups(self):
     #     return self.document_group_repo.get_all_document_groups()
-    def create_conversation(self, request : CreateConversationRequest):
+    async def create_conversation(self, request : CreateConversationRequest):
         try:
-            new_conversation = self.conversation_repo.create_conversation(request.title, request.conv_type)
+            new_conversation = await self.conversation_repo.create_conversation(request.title, request.conv_type)
             for i in request.group_ids:
-                self.conversation_repo.map_conversation_group(conversation_id=new_conversation.id, group_id=i)
+                await self.conversation_repo.map_conversation_group(conversation_id=new_conversation.id, group_id=i)
+            self.group_cache.invalidate(new_conversation.id)
             return new_conversation
         except Exception as e:
             print(e)
 
-    def get_conversation_by_id(self,conversation_id: str):
+    async def get_conversation_by_id(self,conversation_id: str):
         try:
-            return self.conversation_repo.get_conversation_by_id(conversation_id)
+            return await self.conversation_repo.get_conversation_by_id(conversation_id)
         except Exception as e:
             print(e)
             return None
 
-    def get_all_conversations(self):
+    async def get_conversation_page(self, limit: int = None, cursor: str = None) -> ConversationPage:
+        limit = page_size(limit)
+        before = decode_cursor(cursor) if cursor else None
         try:
-            conversations =  self.conversation_repo.get_all_conversation()
-            result = []
-            for i in conversations:
-                result.append(Conversation.model_validate(i))
-            return result
+            conversations = await self.conversation_repo.get_conversation_page(limit + 1, before)
         except Exception as e:
             print(e)
-            return []
+            return ConversationPage(items=[])
+        next_cursor = None
+        if len(conversations) > limit:
+            conversations = conversations[:limit]
+            next_cursor = encode_cursor(conversations[-1].updated_at, conversations[-1].id)
+        return ConversationPage.model_validate({"items": conversations, "next_cursor": next_cursor},
+                                               from_attributes=True)
 
-    def get_messages(self, conversation_id: str):
+    async def get_messages(self, conversation_id: str):
         try:
-            messages = self.conversation_repo.get_messages(conversation_id)
+            messages = await self.conversation_repo.get_messages(conversation_id)
             return messages
         except Exception as e:
             print(f"Error fetching messages: {e}")
             return []
 
-    def delete_conversation(self, conversation_id: str):
+    async def delete_conversation(self, conversation_id: str):
         try:
-            self.conversation_repo.delete_conversation(conversation_id)
+            await self.conversation_repo.delete_conversation(conversation_id)
+            self.group_cache.invalidate(conversation_id)
             return True
         except Exception as e:
             print(f"Error deleting conversation: {e}")
             return False
+
+    async def delete_conversations(self, conversation_ids: list) -> list:
+        try:
+            deleted = await self.conversation_repo.delete_conversations(conversation_ids)
+            for conversation_id in deleted:
+                self.group_cache.invalidate(conversation_id)
+            return deleted
+        except Exception as e:
+            print(f"Error deleting conversations: {e}")
+            return []
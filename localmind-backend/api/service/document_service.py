@@ -1,3 +1,5 @@
+import asyncio
+
 from fastapi import UploadFile,HTTPException
 from api.service.file_storage_service import FileStorageService
 from db.repository.document_group_repo import DocumentGroupRepo
@@ -9,31 +11,64 @@ from db.schema.enums import FileFormat
 
 
 class DocumentService:
-    def __init__(self,db):
+    def __init__(self,db,resources):
+        self.resources = resources
         self.file_storage_service = FileStorageService()
         self.document_repo = DocumentRepo(db)
         self.document_group_repo = DocumentGroupRepo(db)
 
-    def get_document_by_group(self,group_id):
+    async def get_document_by_group(self,group_id):
         try:
             result = []
-            for doc in self.document_repo.get_document_by_group(group_id):
+            for doc in await self.document_repo.get_document_by_group(group_id):
                 result.append(DocumentRead.model_validate(doc))
             return result
         except Exception as e:
             print(e)
 
-    def delete_document(self,document_id):
+    async def delete_document(self,document_id):
+        try:
+            document_id = UUID(document_id)
+        except ValueError as e:
+            print(e)
+            return
+        await self.delete_documents([document_id])
+
+    async def delete_documents(self, document_ids: list[UUID]) -> list[UUID]:
+        """Deletes the documents' rows, stored files and indexed chunks; returns the IDs that existed."""
         try:
-            self.document_repo.delete_document(UUID(document_id))
-            self.file_storage_service.delete_document(document_id)
+            deleted = await self.document_repo.delete_documents(document_ids)
+            if not deleted:
+                return []
+            by_group = {}
+            for document_id, group_id in deleted:
+                by_group.setdefault(group_id, []).append(str(document_id))
+            await self.document_group_repo.update_documents_uploaded(list(by_group))
+            self.resources.conversation_group_cache.clear()
+
+            await asyncio.to_thread(self._delete_files, [str(document_id) for document_id, _ in deleted])
+            # Search no longer filters by document, so the chunks have to go right away
+            for group_id, group_document_ids in by_group.items():
+                collection = self.resources.get_group_collection(group_id)
+                if collection:
+                    await asyncio.to_thread(collection.delete, where={"document_id": {"$in": group_document_ids}})
+            return [document_id for document_id, _ in deleted]
         except Exception as e:
             print(e)
+            return []
+
+    def _delete_files(self, document_ids: list[str]):
+        for document_id in document_ids:
+            try:
+                self.file_storage_service.delete_document(document_id)
+            except HTTPException as e:
+                print(e.detail)
 
     async def create_document(self,group_id:UUID,file : UploadFile):
         try:
             document_id = uuid4()
-            if await self.file_storage_service.store_file(str(document_id), file):
+            content_hash = await self.file_storage_service.store_file(str(document_id), file)
+            if content_hash:
                 path = "/storage/documents/"+str(document_id)
                 filename = file.filename.split(".")[0]
                 file_format = file.filename.split(".")[-1].lower()
@@ -44,8 +79,10 @@ class DocumentService:
                         status_code=400,
                         detail=f"Unsupported file format: {file_format}. Supported: {[f.value for f in FileFormat]}"
                     )
-                self.document_repo.upload_document(document_id,group_id,filename,path,format_enum)
-                self.document_group_repo.update_document_uploaded(group_id)
+                await self.document_repo.upload_document(document_id,group_id,filename,path,format_enum,content_hash)
+                await self.document_group_repo.update_document_uploaded(group_id)
+                # A group becomes searchable with its first document
+                self.resources.conversation_group_cache.clear()
 
         except Exception as e:
             print(e)
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by (model, sha256 of text).
+    Vectors are stored as packed float32 blobs in SQLite; once the stored vectors
+    exceed max_bytes the least recently used entries are evicted.
+    Methods are blocking and thread-safe; call them through asyncio.to_thread.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_embedding_last_used ON embedding (last_used)")
+        self.conn.commit()
+        self.size_bytes = self.conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embedding").fetchone()[0]
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return f"{model}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def get_many(self, model: str, texts: list[str]) -> list[list[float] | None]:
+        keys = [self.make_key(model, text) for text in texts]
+        found = {}
+        with self.lock:
+            # Stay well below SQLite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self.conn.execute(
+                    f"SELECT key, vector FROM embedding WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self.conn.executemany("UPDATE embedding SET last_used = ? WHERE key = ?", [(now, key) for key in found])
+                self.conn.commit()
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        return [self._unpack(found[key]) if key in found else None for key in keys]
+
+    def put_many(self, model: str, texts: list[str], vectors: list[list[float]]):
+        now = time.time()
+        rows = list({
+            key: (key, array("f", vector).tobytes(), now)
+            for key, vector in ((self.make_key(model, text), vector) for text, vector in zip(texts, vectors))
+        }.values())
+        if not rows:
+            return
+        with self.lock:
+            keys = [row[0] for row in rows]
+            existing = 0
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                existing += self.conn.execute(
+                    f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embedding WHERE key IN ({placeholders})", batch
+                ).fetchone()[0]
+            self.conn.executemany("INSERT OR REPLACE INTO embedding (key, vector, last_used) VALUES (?, ?, ?)", rows)
+            self.size_bytes += sum(len(row[1]) for row in rows) - existing
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        if self.size_bytes <= self.max_bytes:
+            return
+        # Free a little extra so eviction doesn't run on every insert once the cache is full
+        to_free = self.size_bytes - int(self.max_bytes * 0.9)
+        freed = 0
+        evicted = []
+        for key, size in self.conn.execute("SELECT key, LENGTH(vector) FROM embedding ORDER BY last_used"):
+            evicted.append((key,))
+            freed += size
+            if freed >= to_free:
+                break
+        self.conn.executemany("DELETE FROM embedding WHERE key = ?", evicted)
+        self.size_bytes -= freed
+        self.evictions += len(evicted)
+
+    @staticmethod
+    def _unpack(blob: bytes) -> list[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
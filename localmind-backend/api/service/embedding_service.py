@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import time
+
+from api.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingService:
+    def __init__(self, resources):
+        self.ollama = resources.ollama
+        self.cache = resources.embedding_cache
+        self.limiter = resources.embedding_limiter
+        self.query_cache = resources.query_embedding_cache
+
+    async def embed(self, text: str) -> list[float] | None:
+        """Embeds a single query. Served from the in-memory query cache when possible."""
+        async def compute():
+            # Interactive embeddings skip the indexing concurrency limiter
+            return (await self.embed_many([text], limited=False))[0]
+
+        if not self.query_cache:
+            return await compute()
+        return await self.query_cache.get_or_compute(f"{settings.EMBEDDING_MODEL}:{text}", compute)
+
+    async def embed_many(self, texts: list[str], limited: bool = True) -> list[list[float] | None]:
+        """
+        Returns one embedding per input text, None where the text could not be embedded.
+        Cached embeddings are served from the on-disk cache; the rest are fetched from Ollama
+        and written back to it.
+        """
+        if not self.cache:
+            return await self._fetch_many(texts, limited)
+
+        embeddings = await asyncio.to_thread(self.cache.get_many, settings.EMBEDDING_MODEL, texts)
+        missing = [i for i, emb in enumerate(embeddings) if emb is None]
+        if not missing:
+            return embeddings
+
+        fetched = await self._fetch_many([texts[i] for i in missing], limited)
+        for i, emb in zip(missing, fetched):
+            embeddings[i] = emb
+
+        new_texts = [texts[i] for i, emb in zip(missing, fetched) if emb is not None]
+        new_vectors = [emb for emb in fetched if emb is not None]
+        if new_vectors:
+            await asyncio.to_thread(self.cache.put_many, settings.EMBEDDING_MODEL, new_texts, new_vectors)
+        return embeddings
+
+    async def _fetch_many(self, texts: list[str], limited: bool) -> list[list[float] | None]:
+        """
+        Embeds texts in batches of EMBEDDING_BATCH_SIZE. When limited, the number of
+        requests in flight is governed by the shared adaptive embedding limiter.
+        """
+        batch_size = max(1, settings.EMBEDDING_BATCH_SIZE)
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        results = await asyncio.gather(*[self.embed_batch(batch, limited) for batch in batches])
+
+        embeddings = []
+        for batch_result in results:
+            embeddings.extend(batch_result)
+        return embeddings
+
+    async def embed_batch(self, texts: list[str], limited: bool = True) -> list[list[float] | None]:
+        embeddings = await self._post_embed(texts, limited)
+        if embeddings is not None:
+            return embeddings
+
+        if len(texts) == 1:
+            return [None]
+
+        # The batch failed as a whole; retry item by item so one bad chunk doesn't sink the others
+        logger.warning(f"Embedding batch of {len(texts)} failed, retrying items individually.")
+        results = []
+        for text in texts:
+            single = await self._post_embed([text], limited)
+            results.append(single[0] if single else None)
+        return results
+
+    async def _post_embed(self, texts: list[str], limited: bool) -> list[list[float]] | None:
+        limiter = self.limiter if limited else None
+        if limiter:
+            await limiter.acquire()
+        started = time.monotonic()
+        ok = False
+        try:
+            embeddings = await self.ollama.embed(settings.EMBEDDING_MODEL, texts)
+            if len(embeddings) != len(texts):
+                logger.error(f"Embedding count mismatch: sent {len(texts)}, got {len(embeddings)}")
+                return None
+            ok = True
+            return embeddings
+        except Exception as e:
+            logger.error(f"Embedding error: {e}")
+            return None
+        finally:
+            if limiter:
+                limiter.release(time.monotonic() - started, ok)
@@ -1,5 +1,5 @@
 from fastapi import UploadFile, HTTPException
-import shutil
+import hashlib
 import os
 from pathlib import Path
 from api.config import settings
@@ -8,24 +8,30 @@ from sqlalchemy import true
 
 
 class FileStorageService:
+    HASH_BLOCK_SIZE = 1024 * 1024
+
     def __init__(self):
         self.UPLOAD_DIR = Path(settings.DOCUMENTS_DIR)
 
     async def store_file(self,file_id:str,file:UploadFile):
+        """Stores the upload and returns the sha256 of its content."""
         self.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
         file_path = self.UPLOAD_DIR / file_id
 
         try:
-            # Method 1: Using shutil (efficient for large files)
+            # Copy in blocks (efficient for large files), hashing as we go
+            digest = hashlib.sha256()
             with file_path.open("wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+                while block := file.file.read(self.HASH_BLOCK_SIZE):
+                    digest.update(block)
+                    buffer.write(block)
 
             # Method 2: Alternative - read all at once (simpler but uses more memory)
             # contents = await file.read()
             # with file_path.open("wb") as f:
             #     f.write(contents)
 
-            return True
+            return digest.hexdigest()
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error uploading file: {str(e)}")
@@ -44,4 +50,11 @@ class FileStorageService:
             return False
 
     def get_file_path(self, file_id: str) -> Path:
-        return self.UPLOAD_DIR / file_id
\ No newline at end of file
+        return self.UPLOAD_DIR / file_id
+
+    def compute_hash(self, file_id: str) -> str:
+        digest = hashlib.sha256()
+        with self.get_file_path(file_id).open("rb") as f:
+            while block := f.read(self.HASH_BLOCK_SIZE):
+                digest.update(block)
+        return digest.hexdigest()
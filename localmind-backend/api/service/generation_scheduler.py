@@ -0,0 +1,157 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+
+
+class GenerationTicket:
+    """A generation's claim on a generation slot. Release it exactly once; extra calls are no-ops."""
+
+    def __init__(self, scheduler: "GenerationScheduler", conversation_id: str, background: bool = False):
+        self.scheduler = scheduler
+        self.conversation_id = conversation_id
+        self.background = background
+        self.future: asyncio.Future | None = None
+        # Generations that will start before this one (0 = runs immediately)
+        self.position = 0
+        self.granted_at = None
+        self.released = False
+
+    @property
+    def granted(self) -> bool:
+        return self.granted_at is not None
+
+    async def wait(self):
+        if self.granted:
+            return
+        try:
+            await asyncio.shield(self.future)
+        except asyncio.CancelledError:
+            self.release()
+            raise
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.scheduler._release(self)
+
+
+class GenerationScheduler:
+    """
+    Admission control for LLM generations.
+    At most `concurrency` generations run at once; up to `queue_size` more wait, served round-robin
+    across conversations so one busy conversation can't starve the others. Beyond that, admit()
+    returns None and the caller rejects the request straight away.
+    Background generations (rolling summaries) take a slot through admit_background() and only
+    get one when no chat stream is waiting.
+    """
+
+    def __init__(self, concurrency: int, queue_size: int):
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(0, queue_size)
+        self.active = 0
+        self.waiting = 0
+        self.queues: OrderedDict[str, deque[GenerationTicket]] = OrderedDict()
+        self.background: deque[GenerationTicket] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.average_duration = None
+
+    def admit(self, conversation_id: str) -> GenerationTicket | None:
+        ticket = GenerationTicket(self, conversation_id)
+        if self.active < self.concurrency and not self.waiting:
+            self.active += 1
+            ticket.granted_at = time.monotonic()
+            self.admitted += 1
+            return ticket
+
+        if self.waiting >= self.queue_size:
+            self.rejected += 1
+            return None
+
+        ticket.future = asyncio.get_running_loop().create_future()
+        self.queues.setdefault(conversation_id, deque()).append(ticket)
+        self.waiting += 1
+        self.admitted += 1
+        ticket.position = self._position(ticket)
+        return ticket
+
+    def admit_background(self, conversation_id: str) -> GenerationTicket:
+        """Low-priority ticket: never rejected, it waits until no chat stream is queued."""
+        ticket = GenerationTicket(self, conversation_id, background=True)
+        if self.active < self.concurrency and not self.waiting and not self.background:
+            self.active += 1
+            ticket.granted_at = time.monotonic()
+            return ticket
+
+        ticket.future = asyncio.get_running_loop().create_future()
+        self.background.append(ticket)
+        ticket.position = self.waiting + len(self.background)
+        return ticket
+
+    def retry_after(self) -> int:
+        """Seconds until a rejected request is likely to be admitted."""
+        duration = self.average_duration or 5.0
+        return max(1, math.ceil(duration * (self.waiting + 1) / self.concurrency))
+
+    def _position(self, ticket: GenerationTicket) -> int:
+        # Round-robin order: every conversation ahead in the rotation gets one more turn before ours
+        index = self.queues[ticket.conversation_id].index(ticket)
+        ahead = index
+        before_in_rotation = True
+        for conversation_id, queue in self.queues.items():
+            if conversation_id == ticket.conversation_id:
+                before_in_rotation = False
+                continue
+            ahead += min(len(queue), index + 1 if before_in_rotation else index)
+        return ahead + 1
+
+    def _release(self, ticket: GenerationTicket):
+        if ticket.granted:
+            self.active -= 1
+            # Only chat streams feed retry_after; short summaries would skew it
+            if not ticket.background:
+                duration = time.monotonic() - ticket.granted_at
+                self.average_duration = duration if self.average_duration is None \
+                    else 0.8 * self.average_duration + 0.2 * duration
+        elif ticket in self.background:
+            self.background.remove(ticket)
+        else:
+            # Still queued: the stream went away before its turn came
+            queue = self.queues.get(ticket.conversation_id)
+            if queue and ticket in queue:
+                queue.remove(ticket)
+                self.waiting -= 1
+                if not queue:
+                    del self.queues[ticket.conversation_id]
+        self._dispatch()
+
+    def _dispatch(self):
+        while self.active < self.concurrency and self.queues:
+            conversation_id, queue = next(iter(self.queues.items()))
+            ticket = queue.popleft()
+            if queue:
+                self.queues.move_to_end(conversation_id)
+            else:
+                del self.queues[conversation_id]
+            self.waiting -= 1
+            self.active += 1
+            ticket.granted_at = time.monotonic()
+            ticket.future.set_result(None)
+        # Chat streams first; background work only gets slots nobody is waiting for
+        while self.active < self.concurrency and self.background:
+            ticket = self.background.popleft()
+            self.active += 1
+            ticket.granted_at = time.monotonic()
+            ticket.future.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.concurrency,
+            "active": self.active,
+            "waiting": self.waiting,
+            "background_waiting": len(self.background),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "average_duration": self.average_duration,
+        }
@@ -0,0 +1,134 @@
+import logging
+
+from api.config import settings
+from api.service.context_packer import estimate_tokens
+from db.database_adapter import SessionLocal
+from db.repository.conversation_repo import ConversationRepo
+from db.repository.message_repo import MessageRepo
+from db.schema.enums import MessageSender
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_INSTRUCTION = (
+    "You maintain a running summary of a conversation between a user and an AI assistant. "
+    "Update the summary with the new turns below. Keep facts, names, decisions and open questions; "
+    "drop pleasantries. Reply with the updated summary only."
+)
+
+
+class HistoryManager:
+    """
+    Keeps the prompt history bounded: the turns not yet summarized are sent verbatim, at most
+    2 * HISTORY_MAX_TURNS of them within HISTORY_TOKEN_BUDGET, and older turns live in a rolling
+    summary stored on the conversation.
+
+    Turns are folded in blocks rather than one per reply: the window grows until it is full, then
+    the background update after that reply folds it back down to the newest HISTORY_MAX_TURNS turns
+    (and half the token budget). Between folds the summary and the verbatim turns don't change, so
+    consecutive prompts share their prefix and Ollama only prefills the new tail; a fold rewrites
+    the summary and costs one full prefill. The trade-off is a prompt up to twice as long as a
+    window that slides every turn.
+    """
+
+    def __init__(self, resources):
+        self.resources = resources
+
+    @staticmethod
+    def window_limit() -> int:
+        # Messages to load for the window: user + assistant per turn, plus the turn in progress
+        return settings.HISTORY_MAX_TURNS * 4 + 2
+
+    @staticmethod
+    def window_start(messages: list, max_turns: int = None, token_budget: int = None) -> int:
+        """Index of the oldest message that still fits in `max_turns` turns and `token_budget` tokens."""
+        max_turns = settings.HISTORY_MAX_TURNS * 2 if max_turns is None else max_turns
+        token_budget = settings.HISTORY_TOKEN_BUDGET if token_budget is None else token_budget
+        start = max(0, len(messages) - max_turns * 2)
+        tokens = 0
+        for i in range(len(messages) - 1, start - 1, -1):
+            tokens += estimate_tokens(messages[i].text)
+            if tokens > token_budget:
+                return i + 1
+        return start
+
+    @staticmethod
+    def fold_start(messages: list) -> int:
+        """
+        Number of leading messages to fold into the summary: none while the next question still
+        fits in the window, otherwise all but the newest HISTORY_MAX_TURNS turns.
+        """
+        window_full = (len(messages) >= settings.HISTORY_MAX_TURNS * 4
+                       or HistoryManager.window_start(messages) > 0)
+        if not window_full:
+            return 0
+        return HistoryManager.window_start(
+            messages, settings.HISTORY_MAX_TURNS, settings.HISTORY_TOKEN_BUDGET // 2
+        )
+
+    def build_history(self, messages: list, skip_message_id: str = None) -> list[dict]:
+        """Turns the newest messages into the verbatim chat history for the prompt."""
+        messages = [msg for msg in messages if str(msg.id) != skip_message_id and msg.text]
+        history = []
+        for msg in messages[self.window_start(messages):]:
+            role = "user" if msg.sender == MessageSender.USER else "assistant"
+            history.append({"role": role, "content": msg.text})
+        return history
+
+    def schedule_summary_update(self, conversation_id: str):
+        self.resources.spawn(self.update_summary(conversation_id), key=f"summary:{conversation_id}")
+
+    async def update_summary(self, conversation_id: str):
+        """Folds the older half of a full window into the conversation's rolling summary."""
+        try:
+            loaded = await self._load_evicted(conversation_id)
+            if not loaded:
+                return
+            summary, evicted = loaded
+
+            summary = await self._summarize(conversation_id, summary, evicted)
+            if summary is None:
+                return
+            await self._save_summary(conversation_id, summary, evicted[-1].created_at)
+            logger.info(f"Folded {len(evicted)} messages into the summary of conversation {conversation_id}")
+        except Exception as e:
+            logger.error(f"Error updating summary of conversation {conversation_id}: {e}")
+
+    @staticmethod
+    async def _load_evicted(conversation_id: str):
+        # Runs after the request finished, so it needs its own session
+        async with SessionLocal() as db:
+            conversation = await ConversationRepo(db).get_conversation_by_id(conversation_id)
+            if not conversation:
+                return None
+            messages = await MessageRepo(db).get_messages_after(conversation_id, conversation.summarized_until)
+            evicted = messages[:HistoryManager.fold_start(messages)]
+            if not evicted:
+                return None
+            return conversation.summary or "", evicted
+
+    @staticmethod
+    async def _save_summary(conversation_id: str, summary: str, summarized_until):
+        async with SessionLocal() as db:
+            await ConversationRepo(db).update_summary(conversation_id, summary, summarized_until)
+
+    async def _summarize(self, conversation_id: str, summary: str, evicted: list) -> str | None:
+        turns = "\n".join(
+            f"{'User' if msg.sender == MessageSender.USER else 'Assistant'}: {msg.text}" for msg in evicted
+        )
+        prompt = f"Current summary:\n{summary or '(empty)'}\n\nNew turns:\n{turns}"
+        # A summary is a generation like any other: it takes a slot, after the waiting chat streams
+        ticket = self.resources.generation_scheduler.admit_background(conversation_id)
+        try:
+            await ticket.wait()
+            response = await self.resources.ollama.chat({
+                "model": settings.LLM_MODEL,
+                "messages": [
+                    {"role": "system", "content": SUMMARY_INSTRUCTION},
+                    {"role": "user", "content": prompt}
+                ],
+                "options": {"num_predict": settings.HISTORY_SUMMARY_MAX_TOKENS}
+            })
+        finally:
+            ticket.release()
+        content = (response.get("message") or {}).get("content", "").strip()
+        return content or None
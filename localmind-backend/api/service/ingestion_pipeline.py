@@ -0,0 +1,361 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+
+from api.config import settings
+from api.service import text_extraction
+from api.service.text_chunker import Chunk, StreamingChunker
+from api.service.training_job import TrainingJob
+from db.schema.enums import FileFormat
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+_END = object()
+
+# Characters read per block from plain-text files
+TEXT_BLOCK_CHARS = 64 * 1024
+
+
+class StageStats:
+    """Counters of one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.chunks = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self._started = time.monotonic()
+
+    @property
+    def throughput(self) -> float:
+        """Chunks per second of wall-clock time since the pipeline started."""
+        elapsed = time.monotonic() - self._started
+        return self.chunks / elapsed if elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (f"{self.name}: {self.items} items, {self.chunks} chunks, {self.throughput:.1f} chunks/s, "
+                f"busy {self.busy_seconds:.1f}s, blocked on downstream {self.wait_seconds:.1f}s")
+
+
+class _DocumentWork:
+    """Per-document state shared by the blocks and chunk batches of one document."""
+
+    def __init__(self, doc):
+        self.doc = doc
+        self.content_hash = doc.content_hash
+        self.chunker = StreamingChunker()
+        self.pending_chunks: list[Chunk] = []
+        self.existing_hashes: dict[str, str] = {}
+        self.chunk_count = 0
+        self.embedded_count = 0
+        self.failed_chunks = 0
+        self.batches_emitted = 0
+        self.batches_done = 0
+        self.chunking_done = False
+        self.error = None
+        self.finished = False
+
+
+class _TextBlock:
+    def __init__(self, work: _DocumentWork, text: str, is_last: bool = False):
+        self.work = work
+        self.text = text
+        self.is_last = is_last
+
+
+class _ChunkBatch:
+    def __init__(self, work: _DocumentWork, first_index: int, chunks: list[Chunk]):
+        self.work = work
+        self.ids = [f"{work.doc.id}_{first_index + i}" for i in range(len(chunks))]
+        self.chunks = chunks
+        self.hashes = [hashlib.sha256(chunk.text.encode("utf-8")).hexdigest() for chunk in chunks]
+        self.changed: list[int] = []
+        self.embeddings: list[list[float] | None] = []
+
+
+class IngestionPipeline:
+    """
+    Streams documents through extract -> chunk -> embed -> upsert.
+    Documents travel as page/text blocks and then as batches of chunks, and stages are
+    connected by bounded queues (INGEST_QUEUE_SIZE): each stage works on different data
+    at the same time, a slow stage holds back the ones before it, and memory stays
+    bounded regardless of document size.
+    """
+
+    def __init__(self, service, job: TrainingJob, collection):
+        self.file_storage_service = service.file_storage_service
+        self.document_repo = service.document_repo
+        # Stages finish documents concurrently but share one AsyncSession, which allows one operation at a time
+        self.db_lock = asyncio.Lock()
+        self.collection = collection
+        self.process_pool = service.process_pool
+        self.embedding_service = service.embedding_service
+        self.embedding_limiter = service.embedding_service.limiter
+        self.job = job
+        self.processed_count = 0
+        self.stats = {name: StageStats(name) for name in ("extract", "chunk", "embed", "upsert")}
+        job.stages = self.stats
+
+    async def run(self, documents) -> int:
+        queue_size = max(1, settings.INGEST_QUEUE_SIZE)
+        to_extract = asyncio.Queue(maxsize=queue_size)
+        to_chunk = asyncio.Queue(maxsize=queue_size)
+        to_embed = asyncio.Queue(maxsize=queue_size)
+        to_upsert = asyncio.Queue(maxsize=queue_size)
+
+        async def feed():
+            for doc in documents:
+                await to_extract.put(_DocumentWork(doc))
+            await to_extract.put(_END)
+
+        await asyncio.gather(
+            feed(),
+            self._stage("extract", self._extract, to_extract, to_chunk, workers=settings.EXTRACTION_WORKERS),
+            # A single chunk worker keeps each document's blocks in order
+            self._stage("chunk", self._chunk, to_chunk, to_embed),
+            # Enough embed workers for the limiter's ceiling; the limiter decides how many actually run
+            self._stage("embed", self._embed, to_embed, to_upsert, workers=settings.EMBEDDING_MAX_INFLIGHT_BATCHES),
+            self._stage("upsert", self._upsert, to_upsert, None),
+        )
+
+        for stats in self.stats.values():
+            logger.info(f"Ingestion stage {stats}")
+        if self.embedding_limiter:
+            logger.info(f"Embedding limiter: {self.embedding_limiter.stats()}")
+        return self.processed_count
+
+    async def _stage(self, name, handler, inbox: asyncio.Queue, outbox: asyncio.Queue | None, workers: int = 1):
+        """
+        Runs handler over every item of inbox. Handlers of stages with an outbox are
+        async generators of downstream items; the last stage's handler is a coroutine.
+        """
+        stats = self.stats[name]
+
+        async def work():
+            while True:
+                item = await inbox.get()
+                if item is _END:
+                    # Pass the marker on to this stage's other workers
+                    await inbox.put(_END)
+                    return
+
+                stats.items += 1
+                started = time.monotonic()
+                try:
+                    if outbox is None:
+                        await handler(item)
+                    else:
+                        async for result in handler(item):
+                            stats.busy_seconds += time.monotonic() - started
+                            waited = time.monotonic()
+                            await outbox.put(result)
+                            stats.wait_seconds += time.monotonic() - waited
+                            started = time.monotonic()
+                except Exception as e:
+                    # Handlers deal with their own failures; this only guards the stage itself
+                    logger.error(f"Unexpected error in {name} stage: {e}")
+                stats.busy_seconds += time.monotonic() - started
+
+        await asyncio.gather(*[work() for _ in range(max(1, workers))])
+        if outbox is not None:
+            await outbox.put(_END)
+
+    def _fail(self, work: _DocumentWork, message: str):
+        # Only the first failure of a document is reported, when the document finishes
+        if work.error is None:
+            work.error = message
+
+    async def _finish(self, work: _DocumentWork):
+        if work.finished:
+            return
+        work.finished = True
+        self.job.record_document()
+
+        if work.error is None and work.failed_chunks:
+            # Leave the document unmarked so the next training run retries the missing chunks
+            work.error = f"{work.failed_chunks} chunks of {work.doc.name} could not be embedded."
+        if work.error is None and not work.chunk_count:
+            work.error = f"Document {work.doc.id} is empty or unreadable (format: {work.doc.format})."
+        if work.error:
+            logger.error(work.error)
+            self.job.record_error(f"Document {work.doc.name} ({work.doc.id}): {work.error}")
+            return
+
+        async with self.db_lock:
+            await self.document_repo.update_document_indexed(work.doc.id, work.content_hash, work.chunk_count)
+        self.processed_count += 1
+        logger.info(f"Indexed document: {work.doc.name} ({work.embedded_count}/{work.chunk_count} chunks embedded)")
+
+    async def _extract(self, work: _DocumentWork):
+        doc = work.doc
+        try:
+            # FileStorageService saves files with the document ID as name
+            file_path = self.file_storage_service.get_file_path(str(doc.id))
+            if not file_path.exists():
+                self._fail(work, f"File not found for document {doc.id}: {file_path}")
+                await self._finish(work)
+                return
+
+            # Documents uploaded before hashing was introduced get their hash on first training
+            if not work.content_hash:
+                work.content_hash = await asyncio.to_thread(self.file_storage_service.compute_hash, str(doc.id))
+
+            existing = await asyncio.to_thread(
+                self.collection.get, where={"document_id": str(doc.id)}, include=["metadatas"]
+            )
+            work.existing_hashes = {
+                chunk_id: (meta or {}).get("chunk_hash")
+                for chunk_id, meta in zip(existing["ids"], existing["metadatas"] or [])
+            }
+        except Exception as e:
+            self._fail(work, f"Error preparing document {doc.id}: {e}")
+            await self._finish(work)
+            return
+
+        try:
+            if doc.format.value == FileFormat.PDF.value:
+                blocks = self._pdf_blocks(str(file_path))
+            else:
+                blocks = self._text_blocks(str(file_path))
+            async for text in blocks:
+                yield _TextBlock(work, text)
+        except Exception as e:
+            self._fail(work, f"Error extracting document {doc.id}: {e}")
+        yield _TextBlock(work, "", is_last=True)
+
+    async def _pdf_blocks(self, file_path: str):
+        # Parsing is CPU-bound, so page ranges are extracted in the process pool,
+        # a few ranges ahead of the consumer but always yielded in page order
+        loop = asyncio.get_running_loop()
+        pool = self.process_pool
+        page_count = await loop.run_in_executor(pool, text_extraction.count_pdf_pages, file_path)
+        pages_per_task = max(1, settings.PDF_PAGES_PER_TASK)
+        prefetch = max(1, settings.EXTRACTION_WORKERS)
+
+        pending = deque()
+        try:
+            for start in range(0, page_count, pages_per_task):
+                pending.append(loop.run_in_executor(
+                    pool, text_extraction.extract_pdf_pages, file_path, start, start + pages_per_task
+                ))
+                if len(pending) >= prefetch:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    async def _text_blocks(self, file_path: str):
+        blocks = text_extraction.iter_text_blocks(file_path, TEXT_BLOCK_CHARS)
+        while (block := await asyncio.to_thread(next, blocks, None)) is not None:
+            yield block
+
+    async def _chunk(self, block: _TextBlock):
+        work = block.work
+        batch_size = max(1, settings.EMBEDDING_BATCH_SIZE)
+
+        if work.error is None:
+            try:
+                work.pending_chunks.extend(work.chunker.feed(block.text))
+                if block.is_last:
+                    work.pending_chunks.extend(work.chunker.finish())
+            except Exception as e:
+                self._fail(work, f"Error chunking document {work.doc.id}: {e}")
+
+        while work.error is None and (
+            len(work.pending_chunks) >= batch_size or (block.is_last and work.pending_chunks)
+        ):
+            chunks = work.pending_chunks[:batch_size]
+            del work.pending_chunks[:batch_size]
+            batch = _ChunkBatch(work, work.chunk_count, chunks)
+            work.chunk_count += len(chunks)
+            work.batches_emitted += 1
+            if block.is_last and not work.pending_chunks:
+                work.chunking_done = True
+            self.stats["chunk"].chunks += len(chunks)
+            yield batch
+
+        if block.is_last:
+            work.chunking_done = True
+            work.pending_chunks = []
+            logger.info(f"Document {work.doc.name} split into {work.chunk_count} chunks.")
+            if work.batches_done == work.batches_emitted:
+                await self._complete(work)
+
+    async def _embed(self, batch: _ChunkBatch):
+        work = batch.work
+        # Chunks whose text is unchanged since the last run keep their stored embedding
+        batch.changed = [
+            i for i, chunk_id in enumerate(batch.ids)
+            if work.existing_hashes.get(chunk_id) != batch.hashes[i]
+        ]
+        if work.error is None and batch.changed:
+            try:
+                batch.embeddings = await self.embedding_service.embed_many([batch.chunks[i].text for i in batch.changed])
+            except Exception as e:
+                self._fail(work, f"Error embedding document {work.doc.id}: {e}")
+            self.stats["embed"].chunks += len(batch.changed)
+        yield batch
+
+    async def _upsert(self, batch: _ChunkBatch):
+        work = batch.work
+        doc = work.doc
+
+        upsert_ids, texts, vectors, metadatas = [], [], [], []
+        for i, emb in zip(batch.changed, batch.embeddings):
+            if emb is None:
+                logger.error(f"Failed to get embedding for chunk {batch.ids[i]} in {doc.name}")
+                work.failed_chunks += 1
+                continue
+            chunk = batch.chunks[i]
+            upsert_ids.append(batch.ids[i])
+            texts.append(chunk.text)
+            vectors.append(emb)
+            metadatas.append({
+                "document_id": str(doc.id),
+                "group_id": str(doc.group_id),
+                "source": doc.name,
+                "chunk_hash": batch.hashes[i],
+                "start": chunk.start,
+                "end": chunk.end,
+            })
+
+        if upsert_ids and work.error is None:
+            try:
+                await asyncio.to_thread(
+                    self.collection.upsert,
+                    ids=upsert_ids,
+                    documents=texts,
+                    embeddings=vectors,
+                    metadatas=metadatas
+                )
+                work.embedded_count += len(upsert_ids)
+                self.job.record_chunks(len(upsert_ids))
+                self.stats["upsert"].chunks += len(upsert_ids)
+            except Exception as e:
+                self._fail(work, f"Error storing chunks of document {doc.id}: {e}")
+
+        work.batches_done += 1
+        if work.chunking_done and work.batches_done == work.batches_emitted:
+            await self._complete(work)
+
+    async def _complete(self, work: _DocumentWork):
+        if work.finished:
+            return
+        # All chunks are stored: drop the ones past the new end of a shortened document
+        if work.error is None and work.chunk_count:
+            stale_ids = [
+                chunk_id for chunk_id in work.existing_hashes
+                if int(chunk_id.rsplit("_", 1)[1]) >= work.chunk_count
+            ]
+            if stale_ids:
+                try:
+                    await asyncio.to_thread(self.collection.delete, ids=stale_ids)
+                except Exception as e:
+                    self._fail(work, f"Error removing stale chunks of document {work.doc.id}: {e}")
+        await self._finish(work)
@@ -0,0 +1,74 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable
+
+from api.config import settings
+
+
+class LiveStream:
+    """
+    In-memory copy of an assistant answer while it is being generated.
+    Any number of followers can read it from an offset and then follow new text as it arrives.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self.truncated = False
+        self.error: Exception | None = None
+        self.followers = 0
+        self._changed = asyncio.get_running_loop().create_future()
+
+    def append(self, chunk: str):
+        self.text += chunk
+        self._notify()
+
+    def finish(self, truncated: bool, error: Exception = None):
+        self.done = True
+        self.truncated = truncated
+        self.error = error
+        self._notify()
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.get_running_loop().create_future()
+        changed.set_result(None)
+
+    async def follow(self, offset: int = 0,
+                     is_disconnected: Callable[[], Awaitable[bool]] = None) -> AsyncIterator[tuple[int, str]]:
+        """
+        Yields (offset, text) pieces from `offset` on until the answer is finished.
+        Stops early once `is_disconnected` reports the reader has gone.
+        """
+        self.followers += 1
+        try:
+            while True:
+                if offset < len(self.text):
+                    start, offset = offset, len(self.text)
+                    yield start, self.text[start:offset]
+                    continue
+                if self.done:
+                    return
+                try:
+                    await asyncio.wait_for(asyncio.shield(self._changed), settings.DISCONNECT_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    if is_disconnected and await is_disconnected():
+                        return
+        finally:
+            self.followers -= 1
+
+
+class LiveStreamRegistry:
+    """Process-local index of the answers currently being generated, by assistant message id."""
+
+    def __init__(self):
+        self.streams: dict[str, LiveStream] = {}
+
+    def open(self, message_id: str) -> LiveStream:
+        stream = LiveStream()
+        self.streams[str(message_id)] = stream
+        return stream
+
+    def get(self, message_id: str) -> LiveStream | None:
+        return self.streams.get(str(message_id))
+
+    def close(self, message_id: str):
+        self.streams.pop(str(message_id), None)
@@ -1,57 +1,64 @@
 import json
 import copy
 import httpx
+from fastapi import HTTPException
+from api.service.generation_scheduler import GenerationTicket
 from api.service.prompt_service import PromptService
 from api.config import settings
 from db.schema.enums import ConversationType
 
 class LLMService:
-    def __init__(self, db):
-        self.base_url = settings.LLM_BASE_URL
+    def __init__(self, db, resources):
+        self.ollama = resources.ollama
+        self.scheduler = resources.generation_scheduler
         self.model = settings.LLM_MODEL
         self.temperature = settings.LLM_TEMPERATURE
         self.max_tokens = settings.LLM_MAX_TOKENS
         self.prompt_service = PromptService()
 
-    async def get_result(self, message: str,conversation_type: ConversationType, history: list = [], context: str = ""):
-        try:
-            messages = copy.deepcopy(history)
-            instruction = self.prompt_service.get_instruction(conversation_type)
-            full_system_content = f"Instruction:\n{instruction}"
-            if context:
-                full_system_content += f"\n\nContext:\n{context}"
-                if messages and messages[0]['role'] == 'system':
-                    messages[0]['content'] = full_system_content
-                else:
-                    messages.insert(0, {"role": "system", "content": full_system_content})
+    def admit(self, conversation_id: str) -> GenerationTicket:
+        """
+        Reserves a place for one generation. Raises 429 with Retry-After when the wait queue is full,
+        before any work is done for the request.
+        """
+        ticket = self.scheduler.admit(conversation_id)
+        if ticket is None:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many chat requests in progress, please retry shortly.",
+                headers={"Retry-After": str(self.scheduler.retry_after())}
+            )
+        return ticket
 
-            if message:
-                if not messages or messages[-1]['content'] != message:
-                    messages.append({"role": "user", "content": message})
+    async def get_result(self, message: str,conversation_type: ConversationType, history: list = [], context: str = "",
+                         summary: str = "", ticket: GenerationTicket = None):
+        try:
+            if ticket:
+                # Wait for a generation slot; the slot is held until the stream ends
+                await ticket.wait()
+            messages = self.build_messages(message, conversation_type, history, context, summary)
 
-            async with httpx.AsyncClient(timeout=300) as client:
-                async with client.stream(
-                        "POST",
-                        f"{self.base_url}/api/chat",
-                        json={
-                            "model": self.model,
-                            "messages": messages,
-                            "stream": True,
-                        }
-                ) as response:
-                    if response.status_code != 200:
-                        raise Exception(f"Ollama API error: {response.status_code}")
+            async with self.ollama.chat_stream({
+                "model": self.model,
+                "messages": messages,
+                "options": {
+                    "temperature": self.temperature,
+                    "num_predict": self.max_tokens,
+                },
+            }) as response:
+                if response.status_code != 200:
+                    raise Exception(f"Ollama API error: {response.status_code}")
 
-                    async for line in response.aiter_lines():
-                        if line.strip():
-                            try:
-                                chunk = json.loads(line)
-                                if "message" in chunk and "content" in chunk["message"]:
-                                    content = chunk["message"]["content"]
-                                    if content:
-                                        yield content
-                            except json.JSONDecodeError:
-                                continue
+                async for line in response.aiter_lines():
+                    if line.strip():
+                        try:
+                            chunk = json.loads(line)
+                            if "message" in chunk and "content" in chunk["message"]:
+                                content = chunk["message"]["content"]
+                                if content:
+                                    yield content
+                        except json.JSONDecodeError:
+                            continue
         except httpx.ConnectError:
             print("ERROR: Cannot connect to Ollama")
             raise Exception(
@@ -61,4 +68,35 @@ class LLMService:
         except Exception as e:
             print(f"LLM streaming error: {e}")
             raise Exception(f"Failed to generate streaming response: {str(e)}")
+        finally:
+            if ticket:
+                ticket.release()
+
+    def build_messages(self, message: str, conversation_type: ConversationType, history: list,
+                       context: str = "", summary: str = "") -> list[dict]:
+        """
+        Lays the prompt out from most to least stable so Ollama can reuse its KV cache across turns:
+        the system instruction (and rolling summary) first, then the verbatim history, and the
+        retrieved context together with the new question last. A follow-up turn then shares its
+        prefix with the previous one and only the new tail needs prefill, until the history window
+        is folded into the summary (see HistoryManager), which happens once every few turns.
+        """
+        instruction = self.prompt_service.get_instruction(conversation_type)
+        system_content = f"Instruction:\n{instruction}"
+        if summary:
+            system_content += f"\n\nSummary of the earlier conversation:\n{summary}"
+
+        messages = [{"role": "system", "content": system_content}]
+        messages.extend(turn for turn in copy.deepcopy(history) if turn['role'] != 'system')
+
+        # The current question is already stored, so it usually closes the history; it's re-added below
+        if message and messages[-1]['role'] == 'user' and messages[-1]['content'] == message:
+            messages.pop()
+
+        question = message or ""
+        if context:
+            question = f"Context:\n{context}\n\nQuestion:\n{question}"
+        if question:
+            messages.append({"role": "user", "content": question})
+        return messages
 
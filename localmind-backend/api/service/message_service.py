@@ -7,15 +7,18 @@ class MessageService:
         self.db = db
         self.message_repo = MessageRepo(db)
 
-    def create_message(self,conversation_id : str, message : str, role : MessageSender):
-        message = self.message_repo.create_message(conversation_id,message,role)
+    async def create_message(self,conversation_id : str, message : str, role : MessageSender):
+        message = await self.message_repo.create_message(conversation_id,message,role)
         return message
 
-    def get_message_by_id(self,message_id : str):
-        return self.message_repo.get_message_by_id(message_id)
+    async def get_message_by_id(self,message_id : str):
+        return await self.message_repo.get_message_by_id(message_id)
 
-    def get_message_by_conversation(self,conversation_id : str):
-        return self.message_repo.get_message_by_conversation(conversation_id)
+    async def get_message_page(self, conversation_id: str, limit: int, before: tuple = None, after: tuple = None):
+        return await self.message_repo.get_message_page(conversation_id, limit, before, after)
 
-    def update_message(self, message_id: str, text: str):
-        return self.message_repo.update_message(message_id, text)
\ No newline at end of file
+    async def get_recent_messages(self, conversation_id: str, limit: int, after=None):
+        return await self.message_repo.get_recent_messages(conversation_id, limit, after)
+
+    async def update_message(self, message_id: str, text: str, truncated: bool = False):
+        return await self.message_repo.update_message(message_id, text, truncated)
\ No newline at end of file
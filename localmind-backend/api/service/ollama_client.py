@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import random
+
+import httpx
+
+from api.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: Ollama answers 429/503 while a model is loading or it is saturated
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class OllamaClient:
+    """
+    App-scoped client for all traffic to settings.LLM_BASE_URL.
+    One pooled keep-alive connection pool is shared by chat, embedding and summary calls;
+    idempotent embedding calls are retried with exponential backoff and full jitter.
+    """
+
+    def __init__(self, base_url: str = None):
+        self.http = httpx.AsyncClient(
+            base_url=base_url or settings.LLM_BASE_URL,
+            limits=httpx.Limits(
+                max_connections=settings.OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OLLAMA_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OLLAMA_KEEPALIVE_EXPIRY
+            ),
+            timeout=httpx.Timeout(settings.OLLAMA_READ_TIMEOUT, connect=settings.OLLAMA_CONNECT_TIMEOUT)
+        )
+
+    async def embed(self, model: str, texts: list[str]) -> list[list[float]]:
+        """Embeds texts with /api/embed. Raises once the retries are exhausted."""
+        attempts = max(1, settings.OLLAMA_EMBED_RETRIES + 1)
+        for attempt in range(attempts):
+            try:
+                response = await self.http.post(
+                    "/api/embed",
+                    json={"model": model, "input": texts, "keep_alive": settings.LLM_KEEP_ALIVE},
+                    timeout=settings.OLLAMA_EMBED_TIMEOUT
+                )
+                if response.status_code in RETRYABLE_STATUS and attempt < attempts - 1:
+                    raise httpx.HTTPStatusError(
+                        f"Ollama returned {response.status_code}", request=response.request, response=response
+                    )
+                response.raise_for_status()
+                return response.json().get("embeddings") or []
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                retryable = isinstance(e, httpx.TransportError) or e.response.status_code in RETRYABLE_STATUS
+                if not retryable or attempt == attempts - 1:
+                    raise
+                delay = random.uniform(0, settings.OLLAMA_RETRY_BACKOFF * 2 ** attempt)
+                logger.warning(f"Embedding request failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def chat_stream(self, payload: dict):
+        """Streams /api/chat; use as `async with client.chat_stream(payload) as response`."""
+        return self.http.stream("POST", "/api/chat", json=self._chat_payload(payload, stream=True))
+
+    async def chat(self, payload: dict) -> dict:
+        # Generation is not retried: it is expensive and the caller decides what a failure means
+        response = await self.http.post("/api/chat", json=self._chat_payload(payload, stream=False))
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def _chat_payload(payload: dict, stream: bool) -> dict:
+        # Every chat call must use the same num_ctx: a different value makes Ollama reload the model
+        # and drop its KV cache. keep_alive keeps the model (and cache) resident between turns.
+        options = {"num_ctx": settings.LLM_NUM_CTX, **payload.get("options", {})}
+        return {"keep_alive": settings.LLM_KEEP_ALIVE, **payload, "options": options, "stream": stream}
+
+    async def close(self):
+        await self.http.aclose()
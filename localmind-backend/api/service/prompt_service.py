@@ -6,8 +6,7 @@ class PromptService:
 
     def get_instruction(self, conversation_type: ConversationType):
         if conversation_type == ConversationType.GENERAL:
-            return 
-            """
+            return """
 
             You are a helpful and honest AI assistant.
             
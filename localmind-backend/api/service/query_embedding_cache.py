@@ -0,0 +1,67 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+
+class QueryEmbeddingCache:
+    """
+    In-memory LRU cache of query embeddings with a TTL.
+    Concurrent lookups of the same text share a single in-flight computation (single-flight),
+    so identical questions arriving together cost one embedding call.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.entries: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+        self.in_flight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[list[float] | None]]) -> list[float] | None:
+        entry = self.entries.get(key)
+        if entry:
+            expires_at, embedding = entry
+            if expires_at > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return embedding
+            del self.entries[key]
+
+        task = self.in_flight.get(key)
+        if task:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # The computation is its own task so that no single caller can cancel it for the others
+            task = asyncio.create_task(self._compute(key, compute))
+            self.in_flight[key] = task
+        # shield: a caller giving up (client went away) only stops its own wait
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[list[float] | None]]) -> list[float] | None:
+        try:
+            embedding = await compute()
+            if embedding is not None:
+                self._store(key, embedding)
+            return embedding
+        finally:
+            del self.in_flight[key]
+
+    def _store(self, key: str, embedding: list[float]):
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, embedding)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from flashrank import RerankRequest
+
+logger = logging.getLogger(__name__)
+
+
+class RerankScheduler:
+    """
+    Runs FlashRank reranking on a dedicated thread pool so ONNX inference never blocks the event loop.
+    Each request is its own job, so with several workers independent queries rerank in parallel.
+    At most queue_size requests may be waiting or running; beyond that rerank() returns None
+    and the caller keeps the vector-search order.
+    """
+
+    def __init__(self, ranker, workers: int, queue_size: int):
+        self.ranker = ranker
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="rerank")
+        self.queue_size = max(1, queue_size)
+        self.outstanding = 0
+        self.requests = 0
+        self.rejected = 0
+        self.skipped = 0
+
+    async def rerank(self, query: str, passages: list[dict]) -> list[dict] | None:
+        if self.outstanding >= self.queue_size:
+            self.rejected += 1
+            logger.warning(f"Rerank queue full ({self.outstanding} outstanding), keeping vector order.")
+            return None
+
+        loop = asyncio.get_running_loop()
+        job = self.executor.submit(self._rerank, query, passages)
+        self.outstanding += 1
+        self.requests += 1
+        # Count the job until the worker is really done with it, not until the caller stops waiting
+        job.add_done_callback(lambda _: loop.call_soon_threadsafe(self._finished))
+        # Cancelling the caller (client went away) drops the job if it hasn't started yet
+        return await asyncio.wrap_future(job)
+
+    def record_skip(self):
+        self.skipped += 1
+
+    def _finished(self):
+        self.outstanding -= 1
+
+    def _rerank(self, query: str, passages: list[dict]) -> list[dict] | None:
+        try:
+            return self.ranker.rerank(RerankRequest(query=query, passages=passages))
+        except Exception as e:
+            logger.error(f"Rerank error: {e}")
+            return None
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "skipped": self.skipped,
+        }
@@ -0,0 +1,212 @@
+import os
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import Request
+
+from api.config import settings
+from api.service.adaptive_limiter import AdaptiveLimiter
+from api.service.conversation_group_cache import ConversationGroupCache
+from api.service.embedding_cache import EmbeddingCache
+from api.service.generation_scheduler import GenerationScheduler
+from api.service.live_stream import LiveStreamRegistry
+from api.service.ollama_client import OllamaClient
+from api.service.query_embedding_cache import QueryEmbeddingCache
+from api.service.rerank_scheduler import RerankScheduler
+from api.service.training_job_service import TrainingJobManager
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceRegistry:
+    """
+    Process-wide holder for the expensive objects every request needs
+    (Chroma client and collections, FlashRank model, Ollama client).
+    Built once per worker in the app lifespan and injected into services via get_resources.
+    """
+
+    def __init__(self):
+        self.chroma_client = None
+        self.collections = {}
+        self.collections_lock = threading.Lock()
+        self.ranker = None
+        self.reranker: RerankScheduler | None = None
+        self.ollama: OllamaClient | None = None
+        self.generation_scheduler: GenerationScheduler | None = None
+        self.live_streams = LiveStreamRegistry()
+        self.conversation_group_cache = ConversationGroupCache(
+            max_entries=settings.CONVERSATION_GROUP_CACHE_SIZE,
+            ttl_seconds=settings.CONVERSATION_GROUP_CACHE_TTL_SECONDS
+        )
+        self.process_pool: ProcessPoolExecutor | None = None
+        self.embedding_cache: EmbeddingCache | None = None
+        self.embedding_limiter: AdaptiveLimiter | None = None
+        self.query_embedding_cache: QueryEmbeddingCache | None = None
+        self.training_jobs = None
+        self.background_tasks: dict[str, asyncio.Task] = {}
+        self.closing = False
+
+    def start(self):
+        if not os.path.exists(settings.VECTOR_DB_DIR):
+            os.makedirs(settings.VECTOR_DB_DIR)
+
+        try:
+            import chromadb
+            self.chroma_client = chromadb.PersistentClient(path=settings.VECTOR_DB_DIR)
+        except Exception as e:
+            logger.error(f"Error initializing ChromaDB: {e}. RAG features will not work.")
+            self.chroma_client = None
+
+        try:
+            from flashrank import Ranker
+            self.ranker = Ranker()
+            self.reranker = RerankScheduler(
+                self.ranker,
+                workers=settings.RERANK_WORKERS,
+                queue_size=settings.RERANK_QUEUE_SIZE
+            )
+        except Exception as e:
+            logger.error(f"Error initializing FlashRank: {e}")
+            self.ranker = None
+
+        self.ollama = OllamaClient()
+        self.generation_scheduler = GenerationScheduler(
+            concurrency=settings.GENERATION_CONCURRENCY,
+            queue_size=settings.GENERATION_QUEUE_SIZE
+        )
+
+        self.embedding_limiter = AdaptiveLimiter(
+            "Embedding",
+            initial=settings.EMBEDDING_INITIAL_INFLIGHT_BATCHES,
+            minimum=settings.EMBEDDING_MIN_INFLIGHT_BATCHES,
+            maximum=settings.EMBEDDING_MAX_INFLIGHT_BATCHES,
+            latency_tolerance=settings.EMBEDDING_LATENCY_TOLERANCE
+        )
+
+        self.query_embedding_cache = QueryEmbeddingCache(
+            max_entries=settings.QUERY_EMBEDDING_CACHE_SIZE,
+            ttl_seconds=settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+        )
+
+        if settings.EMBEDDING_CACHE_ENABLED:
+            try:
+                self.embedding_cache = EmbeddingCache(
+                    settings.EMBEDDING_CACHE_PATH,
+                    max_bytes=settings.EMBEDDING_CACHE_MAX_MB * 1024 * 1024
+                )
+            except Exception as e:
+                logger.error(f"Error opening embedding cache: {e}")
+                self.embedding_cache = None
+
+        # spawn: forking a process that already runs an event loop and threads is unsafe
+        self.process_pool = ProcessPoolExecutor(
+            max_workers=max(1, settings.EXTRACTION_WORKERS),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self.training_jobs = TrainingJobManager(self)
+        self.training_jobs.start()
+        logger.info("Shared resources initialized.")
+
+    async def close(self):
+        # Tasks cancelled here may try to spawn follow-up work (e.g. a summary update); refuse it
+        self.closing = True
+        while self.background_tasks:
+            tasks = list(self.background_tasks.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for key, task in list(self.background_tasks.items()):
+                if task.done():
+                    del self.background_tasks[key]
+
+        if self.training_jobs:
+            await self.training_jobs.close()
+            self.training_jobs = None
+
+        if self.ollama:
+            await self.ollama.close()
+            self.ollama = None
+
+        if self.process_pool:
+            self.process_pool.shutdown(wait=False, cancel_futures=True)
+            self.process_pool = None
+
+        if self.embedding_cache:
+            self.embedding_cache.close()
+            self.embedding_cache = None
+
+        if self.chroma_client:
+            try:
+                # chromadb has no close(); clearing the system cache stops the client and releases its files
+                self.chroma_client.clear_system_cache()
+            except Exception as e:
+                logger.error(f"Error closing ChromaDB: {e}")
+            self.chroma_client = None
+            self.collections = {}
+
+        if self.reranker:
+            self.reranker.close()
+            self.reranker = None
+
+        self.ranker = None
+        logger.info("Shared resources closed.")
+
+    def spawn(self, coroutine, key: str):
+        """
+        Runs a fire-and-forget coroutine owned by the app, at most one per key:
+        if a task with the same key is still running the new coroutine is dropped.
+        Tasks are cancelled on shutdown, and once shutdown has started the coroutine is
+        dropped and None is returned.
+        """
+        if self.closing:
+            coroutine.close()
+            return None
+        running = self.background_tasks.get(key)
+        if running and not running.done():
+            coroutine.close()
+            return running
+        task = asyncio.create_task(coroutine)
+        self.background_tasks[key] = task
+
+        def forget(done):
+            if self.background_tasks.get(key) is done:
+                del self.background_tasks[key]
+
+        task.add_done_callback(forget)
+        return task
+
+    def get_group_collection(self, group_id):
+        """
+        Returns the Chroma collection holding the chunks of one document group,
+        or None when Chroma is unavailable. Each group has its own HNSW index, so
+        search cost depends on the size of the searched groups, not the whole corpus.
+        """
+        if not self.chroma_client:
+            return None
+        group_id = str(group_id)
+        with self.collections_lock:
+            collection = self.collections.get(group_id)
+            if collection is None:
+                collection = self.chroma_client.get_or_create_collection(
+                    name=f"{settings.VECTOR_COLLECTION_PREFIX}_{group_id}",
+                    metadata={"hnsw:space": "cosine"}
+                )
+                self.collections[group_id] = collection
+            return collection
+
+    def metrics(self) -> dict:
+        return {
+            "embedding_cache": self.embedding_cache.stats() if self.embedding_cache else None,
+            "embedding_limiter": self.embedding_limiter.stats() if self.embedding_limiter else None,
+            "query_embedding_cache": self.query_embedding_cache.stats() if self.query_embedding_cache else None,
+            "reranker": self.reranker.stats() if self.reranker else None,
+            "conversation_group_cache": self.conversation_group_cache.stats(),
+            "generation_scheduler": self.generation_scheduler.stats() if self.generation_scheduler else None,
+        }
+
+
+def get_resources(request: Request) -> ResourceRegistry:
+    return request.app.state.resources
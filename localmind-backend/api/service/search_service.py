@@ -1,161 +1,148 @@
-import os
+import asyncio
 import logging
-import httpx
-import chromadb
 from api.config import settings
-from db.repository.document_repo import DocumentRepo
+from api.service.embedding_service import EmbeddingService
+from api.service.stage_timer import StageTimer
 from db.repository.document_group_repo import DocumentGroupRepo
-from flashrank import Ranker, RerankRequest
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class SearchService:
-    def __init__(self, db):
-        self.document_repo = DocumentRepo(db)
+    def __init__(self, db, resources):
         self.document_group_repo = DocumentGroupRepo(db)
-        
-        if not os.path.exists(settings.VECTOR_DB_DIR):
-            os.makedirs(settings.VECTOR_DB_DIR)
-        
-        try:
-            self.chroma_client = chromadb.PersistentClient(path=settings.VECTOR_DB_DIR)
-            self.collection = self.chroma_client.get_or_create_collection(
-                name="localmind_rag",
-                metadata={"hnsw:space": "cosine"}
-            )
-        except Exception as e:
-            logger.error(f"Error initializing ChromaDB: {e}")
-            self.chroma_client = None
-            self.collection = None
-        
-        try:
-             self.ranker = Ranker()
-        except Exception as e:
-             logger.error(f"Error initializing FlashRank: {e}")
-             self.ranker = None
+        self.resources = resources
+        self.group_cache = resources.conversation_group_cache
+        self.reranker = resources.reranker
+        self.embedding_service = EmbeddingService(resources)
 
     async def search(self, query: str, conversation_id: str, n_results: int = 5):
         """
         Search for relevant document chunks for a given query within the context 
         of a conversation's assigned document groups.
         """
-        if not self.collection:
-            logger.warning("ChromaDB collection not available.")
+        if not self.resources.chroma_client:
+            logger.warning("ChromaDB not available.")
             return []
 
-        # 1. Get document groups assigned to this conversation
-        # Note: This relies on the method you added to DocumentGroupRepo
-        document_groups = self.document_group_repo.get_document_group_by_conversation_id(conversation_id)
-        
-        if not document_groups:
+        # 1. Look up the conversation's document groups while the query is embedded
+        group_ids, query_embedding = await asyncio.gather(
+            self.get_group_ids(conversation_id),
+            self.embedding_service.embed(query)
+        )
+
+        if not group_ids:
             logger.info(f"No document groups found for conversation {conversation_id}")
             return []
 
-        # 2. Collect all valid document IDs from these groups
-        allowed_doc_ids = []
-        for group in document_groups:
-            # We assume get_document_by_group returns a list of objects with an 'id' attribute
-            docs = self.document_repo.get_document_by_group(group.id)
-            for doc in docs:
-                allowed_doc_ids.append(str(doc.id))
-        
-        # If no documents are in the groups, return empty
-        if not allowed_doc_ids:
-            logger.info("No documents found in the assigned groups.")
+        return await self.retrieve(query, query_embedding, group_ids, n_results)
+
+    async def get_group_ids(self, conversation_id: str):
+        """The conversation's searchable group IDs, from the per-conversation cache when possible."""
+        group_ids = self.group_cache.get(conversation_id)
+        if group_ids is None:
+            group_ids = await self.document_group_repo.get_searchable_group_ids(conversation_id)
+            if group_ids is None:
+                return []
+            self.group_cache.put(conversation_id, group_ids)
+        return group_ids
+
+    async def retrieve(self, query: str, query_embedding, group_ids, n_results: int = 5,
+                       timer: StageTimer = None):
+        """
+        Vector search over the given document groups followed by reranking,
+        for callers that already hold the query embedding and the group IDs.
+        """
+        if not self.resources.chroma_client:
+            logger.warning("ChromaDB not available.")
             return []
-        
-        # 3. Generate embedding for the query
-        query_embedding = await self._get_embedding(query)
+
         if not query_embedding:
             logger.warning("Failed to generate query embedding.")
             return []
 
-        # 4. Query ChromaDB with filtering
-        # We filter by document_id being in our allowed list
+        timer = timer or StageTimer()
+
+        # 2. Query each group's partition in parallel and merge the candidates
         try:
             # RETRIEVAL PHASE
             # We fetch MORE candidates than requested (e.g. 3x) to give the reranker enough options
             retrieval_limit = n_results * 3
-            
-            results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=retrieval_limit,
-                where={"document_id": {"$in": allowed_doc_ids}}
-            )
-            
-            initial_results = []
-            
-            if results and results['documents']:
-                num_matches = len(results['documents'][0])
-                for i in range(num_matches):
-                    # We skip the static distance check here because the Re-ranker is much smarter
-                    item = {
-                        "id": results['ids'][0][i],
-                        "text": results['documents'][0][i],
-                        "meta": results['metadatas'][0][i] if results['metadatas'] else {},
-                        # Flatten metadata for FlashRank if needed, but it accepts a dict 'meta'
-                    }
-                    initial_results.append(item)
+
+            with timer.stage("vector_search"):
+                partitions = await asyncio.gather(*[
+                    asyncio.to_thread(self._query_group, group_id, query_embedding, retrieval_limit)
+                    for group_id in group_ids
+                ])
+
+            # We skip the static distance check here because the Re-ranker is much smarter
+            initial_results = [item for partition in partitions for item in partition]
+            initial_results.sort(key=lambda item: item["distance"])
+            initial_results = initial_results[:retrieval_limit]
             
             if not initial_results:
                 return []
 
             # RERANKING PHASE
-            if self.ranker:
-                logger.info(f"Reranking {len(initial_results)} documents...")
-                rerank_request = RerankRequest(query=query, passages=initial_results)
-                reranked_results = self.ranker.rerank(rerank_request)
-                
-                # Sort by score descending (FlashRank usually does this, but good to be safe)
-                # FlashRank returns dicts with 'score' key
-                # We limit to the original requested n_results
-                final_output = []
-                for res in reranked_results[:n_results]:
-                     final_output.append({
-                         "content": res['text'],
-                         "metadata": res['meta'],
-                         "id": res['id'],
-                         "score": res['score']
-                     })
-                return final_output
-            
-            else:
-                # Fallback if ranker failed to load
-                fallback_output = []
-                for item in initial_results[:n_results]:
-                    fallback_output.append({
-                        "content": item['text'],
-                        "metadata": item['meta'],
-                        "id": item['id']
-                    })
-                return fallback_output
+            if self.reranker:
+                if self._clearly_separated(initial_results, n_results):
+                    self.reranker.record_skip()
+                    logger.info("Top results clearly separated by distance, skipping rerank.")
+                else:
+                    logger.info(f"Reranking {len(initial_results)} documents...")
+                    with timer.stage("rerank"):
+                        reranked_results = await self.reranker.rerank(query, initial_results)
+                    if reranked_results is not None:
+                        # FlashRank returns passages sorted by 'score' descending
+                        # We limit to the original requested n_results
+                        final_output = []
+                        for res in reranked_results[:n_results]:
+                            final_output.append({
+                                "content": res['text'],
+                                "metadata": res['meta'],
+                                "id": res['id'],
+                                "score": res['score']
+                            })
+                        return final_output
+
+            # Fallback: ranker not loaded, rerank skipped or rerank queue full
+            fallback_output = []
+            for item in initial_results[:n_results]:
+                fallback_output.append({
+                    "content": item['text'],
+                    "metadata": item['meta'],
+                    "id": item['id']
+                })
+            return fallback_output
 
         except Exception as e:
             logger.error(f"Error querying ChromaDB: {e}")
             return []
 
-    async def _get_embedding(self, text: str):
-        """
-        Generates an embedding for the given text using the configured LLM service.
-        """
+    @staticmethod
+    def _clearly_separated(results: list[dict], n_results: int) -> bool:
+        """True when the top n_results already beat every other candidate by RERANK_SKIP_DISTANCE_GAP."""
+        if settings.RERANK_SKIP_DISTANCE_GAP <= 0 or len(results) <= n_results:
+            return False
+        gap = results[n_results]["distance"] - results[n_results - 1]["distance"]
+        return gap >= settings.RERANK_SKIP_DISTANCE_GAP
+
+    def _query_group(self, group_id, query_embedding, n_results: int) -> list[dict]:
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{settings.LLM_BASE_URL}/api/embeddings",
-                    json={
-                        "model": settings.EMBEDDING_MODEL,
-                        "prompt": text
-                    }
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"Embedding API error: {response.text}")
-                    return None
-                    
-                data = response.json()
-                return data.get("embedding")
+            collection = self.resources.get_group_collection(group_id)
+            results = collection.query(query_embeddings=[query_embedding], n_results=n_results)
         except Exception as e:
-            logger.error(f"Error generating embedding: {e}")
-            return None
\ No newline at end of file
+            logger.error(f"Error querying ChromaDB for group {group_id}: {e}")
+            return []
+
+        items = []
+        if results and results['documents']:
+            for i in range(len(results['documents'][0])):
+                items.append({
+                    "id": results['ids'][0][i],
+                    "text": results['documents'][0][i],
+                    "meta": results['metadatas'][0][i] if results['metadatas'] else {},
+                    "distance": results['distances'][0][i] if results.get('distances') else 0.0,
+                })
+        return items
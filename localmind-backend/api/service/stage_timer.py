@@ -0,0 +1,27 @@
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Wall-clock breakdown of one request. Stages may overlap (they run concurrently),
+    so their durations do not necessarily add up to the elapsed time.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - started
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        return " ".join(f"{name}={seconds:.3f}s" for name, seconds in self.stages.items())
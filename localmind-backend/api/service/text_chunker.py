@@ -0,0 +1,97 @@
+import re
+from typing import Iterable, Iterator
+
+from api.config import settings
+
+_WHITESPACE = re.compile(r"\s")
+
+
+class Chunk:
+    def __init__(self, text: str, start: int, end: int):
+        self.text = text
+        # Character offsets of the chunk in the source document
+        self.start = start
+        self.end = end
+
+
+class StreamingChunker:
+    """
+    Incremental splitter for CHUNK_SIZE / CHUNK_OVERLAP chunks.
+    Text is fed block by block (pages, lines, file reads) and chunks come out as soon as
+    they are complete, so only about one chunk plus the current block is held in memory.
+    Splits prefer paragraph, line, sentence and word boundaries, in that order.
+    """
+
+    SEPARATORS = ("\n\n", "\n", ". ", " ")
+
+    def __init__(self, chunk_size: int = None, chunk_overlap: int = None):
+        self.chunk_size = max(1, chunk_size or settings.CHUNK_SIZE)
+        overlap = settings.CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+        # Splits never land before half a chunk, so a smaller overlap always makes progress
+        self.chunk_overlap = max(0, min(overlap, self.chunk_size // 2 - 1))
+        self.buffer = ""
+        self.pos = 0
+        # Document offset of buffer[0]
+        self.offset = 0
+        # Document offset where the last emitted chunk ended
+        self.emitted_end = 0
+
+    def feed(self, text: str) -> Iterator[Chunk]:
+        if self.pos:
+            self.offset += self.pos
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += text
+
+        while len(self.buffer) - self.pos > self.chunk_size:
+            chunk = self._emit(self._split_point())
+            if chunk:
+                yield chunk
+
+    def finish(self) -> Iterator[Chunk]:
+        # The tail is only worth a chunk if it holds text beyond the previous chunk's overlap
+        unseen = self.buffer[max(self.emitted_end - self.offset, self.pos):]
+        if unseen.strip():
+            chunk = self._emit(len(self.buffer) - self.pos)
+            if chunk:
+                yield chunk
+        self.offset += len(self.buffer)
+        self.buffer = ""
+        self.pos = 0
+
+    def _split_point(self) -> int:
+        window = self.buffer[self.pos:self.pos + self.chunk_size]
+        for separator in self.SEPARATORS:
+            index = window.rfind(separator)
+            if index >= self.chunk_size // 2:
+                return index + len(separator)
+        return self.chunk_size
+
+    def _emit(self, length: int) -> Chunk | None:
+        start = self.pos
+        end = self.pos + length
+        raw = self.buffer[start:end]
+        self.emitted_end = self.offset + end
+
+        next_pos = end
+        if self.chunk_overlap:
+            next_pos = end - self.chunk_overlap
+            # Start the overlap on a word boundary when there is one
+            match = _WHITESPACE.search(self.buffer, next_pos, end)
+            if match:
+                next_pos = match.end()
+        self.pos = max(next_pos, start + 1)
+
+        text = raw.strip()
+        if not text:
+            return None
+        leading = len(raw) - len(raw.lstrip())
+        chunk_start = self.offset + start + leading
+        return Chunk(text, chunk_start, chunk_start + len(text))
+
+
+def iter_chunks(blocks: Iterable[str], chunk_size: int = None, chunk_overlap: int = None) -> Iterator[Chunk]:
+    chunker = StreamingChunker(chunk_size, chunk_overlap)
+    for block in blocks:
+        yield from chunker.feed(block)
+    yield from chunker.finish()
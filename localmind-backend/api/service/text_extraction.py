@@ -0,0 +1,42 @@
+"""
+Blocking text extraction helpers.
+The PDF functions run inside the extraction ProcessPoolExecutor, so they must stay
+module-level (picklable) and must not touch the event loop, the DB or shared resources.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def count_pdf_pages(file_path: str) -> int:
+    try:
+        import pypdf
+        return len(pypdf.PdfReader(file_path).pages)
+    except ImportError:
+        logger.warning("pypdf not installed. Cannot read PDF.")
+        return 0
+    except Exception as e:
+        logger.error(f"Error reading PDF: {e}")
+        return 0
+
+
+def extract_pdf_pages(file_path: str, start: int, end: int) -> str:
+    try:
+        import pypdf
+        reader = pypdf.PdfReader(file_path)
+        return "".join((reader.pages[i].extract_text() or "") + "\n" for i in range(start, min(end, len(reader.pages))))
+    except ImportError:
+        logger.warning("pypdf not installed. Cannot read PDF. returning empty.")
+        return ""
+    except Exception as e:
+        logger.error(f"Error reading PDF pages {start}-{end}: {e}")
+        return ""
+
+
+def iter_text_blocks(file_path: str, block_chars: int):
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            while block := f.read(block_chars):
+                yield block
+    except Exception as e:
+        logger.error(f"Error reading file: {e}")
@@ -0,0 +1,67 @@
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from db.schema.enums import TrainingJobStatus
+
+
+class TrainingJob:
+    """Progress of one indexing run of a document group."""
+
+    def __init__(self, group_id: str):
+        self.id = str(uuid4())
+        self.group_id = group_id
+        self.status = TrainingJobStatus.QUEUED
+        self.created_at = datetime.now(timezone.utc)
+        self.started_at = None
+        self.finished_at = None
+        self.documents_total = 0
+        self.documents_processed = 0
+        self.chunks_processed = 0
+        self.errors: list[str] = []
+        self.stages = {}
+        self.result = None
+        self.rerun_requested = False
+        self._started_monotonic = None
+
+    def mark_started(self):
+        self.status = TrainingJobStatus.RUNNING
+        self.started_at = datetime.now(timezone.utc)
+        self._started_monotonic = time.monotonic()
+
+    def mark_finished(self, status: TrainingJobStatus):
+        self.status = status
+        self.finished_at = datetime.now(timezone.utc)
+
+    def add_documents(self, count: int):
+        self.documents_total += count
+
+    def record_document(self):
+        self.documents_processed += 1
+
+    def record_chunks(self, count: int):
+        self.chunks_processed += count
+
+    def record_error(self, message: str):
+        self.errors.append(message)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self._started_monotonic is None:
+            return 0.0
+        if self.finished_at:
+            return (self.finished_at - self.started_at).total_seconds()
+        return time.monotonic() - self._started_monotonic
+
+    @property
+    def throughput(self) -> float:
+        """Chunks embedded per second."""
+        elapsed = self.elapsed_seconds
+        return self.chunks_processed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> float | None:
+        if self.status != TrainingJobStatus.RUNNING or not self.documents_processed:
+            return None
+        remaining = max(self.documents_total - self.documents_processed, 0)
+        return remaining * self.elapsed_seconds / self.documents_processed
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from collections import OrderedDict
+
+from api.config import settings
+from api.service.model_train_service import ModelTrainService
+from api.service.training_job import TrainingJob
+from db.database_adapter import SessionLocal
+from db.schema.enums import TrainingJobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class TrainingJobManager:
+    """
+    In-process queue of training jobs served by a fixed pool of worker tasks.
+    A group has at most one queued or running job; further requests are merged into it.
+    """
+
+    def __init__(self, resources):
+        self.resources = resources
+        self.queue: asyncio.Queue[TrainingJob] = asyncio.Queue()
+        self.jobs: OrderedDict[str, TrainingJob] = OrderedDict()
+        self.active_jobs: dict[str, TrainingJob] = {}
+        self.workers: list[asyncio.Task] = []
+
+    def start(self):
+        for i in range(max(1, settings.TRAINING_WORKERS)):
+            self.workers.append(asyncio.create_task(self._worker(), name=f"training-worker-{i}"))
+
+    async def close(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    def submit(self, group_id: str) -> TrainingJob:
+        job = self.active_jobs.get(group_id)
+        if job:
+            if job.status == TrainingJobStatus.RUNNING:
+                # Documents may have changed since the run started; go over the group once more afterwards
+                job.rerun_requested = True
+            return job
+
+        job = TrainingJob(group_id)
+        self.jobs[job.id] = job
+        self.active_jobs[group_id] = job
+        self._prune_history()
+        self.queue.put_nowait(job)
+        return job
+
+    def get_job(self, job_id: str) -> TrainingJob | None:
+        return self.jobs.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self.active_jobs.pop(job.group_id, None)
+                self.queue.task_done()
+
+    async def _run(self, job: TrainingJob):
+        job.mark_started()
+        try:
+            async with SessionLocal() as db:
+                service = ModelTrainService(db, self.resources)
+                while True:
+                    job.rerun_requested = False
+                    job.result = await service.train_model(job.group_id, job)
+                    if not job.rerun_requested:
+                        break
+            failed = job.result.get("status") != "success"
+            job.mark_finished(TrainingJobStatus.FAILED if failed else TrainingJobStatus.COMPLETED)
+        except asyncio.CancelledError:
+            job.mark_finished(TrainingJobStatus.FAILED)
+            job.record_error("Training was cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Training job {job.id} failed: {e}")
+            job.record_error(str(e))
+            job.mark_finished(TrainingJobStatus.FAILED)
+
+    def _prune_history(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished_at]
+        for job_id in finished[:max(len(self.jobs) - settings.TRAINING_JOB_HISTORY, 0)]:
+            del self.jobs[job_id]
@@ -1,4 +1,5 @@
-from db.database_adapter import SessionLocal, get_db
+from sqlalchemy import delete, select, tuple_, update
+
 from db.schema import ConversationDocumentGroupORM
 from db.schema.conversation import ConversationORM
 from db.schema.enums import ConversationType
@@ -9,27 +10,55 @@ class ConversationRepo:
     def __init__(self,db):
         self.db_session = db
 
-    def create_conversation(self, title: str = "title",conv_type : ConversationType = ConversationType.GENERAL):
+    async def create_conversation(self, title: str = "title",conv_type : ConversationType = ConversationType.GENERAL):
         new_conversation = ConversationORM(title=title, conv_type= conv_type)
         self.db_session.add(new_conversation)
-        self.db_session.commit()
+        await self.db_session.commit()
         return new_conversation
 
-    def get_all_conversation(self):
-        return self.db_session.query(ConversationORM).all()
+    async def get_conversation_page(self, limit: int, before: tuple = None):
+        """Up to `limit` conversations, most recently updated first, after the (updated_at, id) keyset `before`."""
+        query = select(ConversationORM)
+        if before:
+            query = query.where(tuple_(ConversationORM.updated_at, ConversationORM.id) < tuple_(*before))
+        result = await self.db_session.execute(
+            query.order_by(ConversationORM.updated_at.desc(), ConversationORM.id.desc()).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def get_conversation_by_id(self,conversation_id) -> ConversationORM:
+        result = await self.db_session.execute(select(ConversationORM).where(ConversationORM.id == conversation_id))
+        return result.scalars().first()
+
+    async def update_summary(self, conversation_id, summary: str, summarized_until):
+        # Bulk update so the summary doesn't bump updated_at (it isn't user activity)
+        await self.db_session.execute(
+            update(ConversationORM)
+            .where(ConversationORM.id == conversation_id)
+            .values(summary=summary, summarized_until=summarized_until, updated_at=ConversationORM.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db_session.commit()
 
-    def get_conversation_by_id(self,conversation_id) -> ConversationORM:
-        return self.db_session.query(ConversationORM).filter_by(id=conversation_id).first()
+    async def delete_conversation(self, conversation_id):
+        return bool(await self.delete_conversations([conversation_id]))
 
-    def delete_conversation(self, conversation_id):
-        conversation = self.get_conversation_by_id(conversation_id)
-        if conversation:
-            self.db_session.delete(conversation)
-            self.db_session.commit()
-            return True
-        return False
+    async def delete_conversations(self, conversation_ids) -> list:
+        """
+        Deletes the conversations in one statement and returns the IDs that existed.
+        Their messages and group links are removed by ON DELETE CASCADE.
+        """
+        result = await self.db_session.execute(
+            delete(ConversationORM)
+            .where(ConversationORM.id.in_(conversation_ids))
+            .returning(ConversationORM.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = list(result.scalars().all())
+        await self.db_session.commit()
+        return deleted
 
-    def map_conversation_group(self,conversation_id,group_id):
+    async def map_conversation_group(self,conversation_id,group_id):
         mapper = ConversationDocumentGroupORM(conversation_id=conversation_id,group_id=group_id)
         self.db_session.add(mapper)
-        self.db_session.commit()    
+        await self.db_session.commit()
@@ -1,9 +1,8 @@
-from datetime import datetime
-from typing import Any
+from datetime import datetime, timezone
 
-import sqlalchemy
+from sqlalchemy import exists, select, update
 
-from db.database_adapter import SessionLocal
+from db.schema.document import DocumentORM
 from db.schema.document_group import DocumentGroupORM
 from db.schema.conv_doc_group import ConversationDocumentGroupORM
 
@@ -13,59 +12,91 @@ class DocumentGroupRepo:
     def __init__(self,db):
         self.db_session = db
 
-    def create_document_group(self, title: str = "title"):
+    async def create_document_group(self, title: str = "title"):
         try:
             new_document = DocumentGroupORM(name=title)
             self.db_session.add(new_document)
-            self.db_session.commit()
+            await self.db_session.commit()
             return new_document
         except Exception as e:
             print(e)
 
-    def get_all_document_groups(self) -> list[DocumentGroupORM] | None:
+    async def get_all_document_groups(self) -> list[DocumentGroupORM] | None:
         try:
-            all_documents = self.db_session.query(DocumentGroupORM).all()
-            return all_documents
+            result = await self.db_session.execute(select(DocumentGroupORM))
+            return list(result.scalars().all())
         except Exception as e:
             print(e)
 
-    def get_document_group(self, document_id):
+    async def get_document_group(self, document_id):
         try:
-            return self.db_session.query(DocumentGroupORM).filter(DocumentGroupORM.id == document_id).one_or_none()
+            result = await self.db_session.execute(select(DocumentGroupORM).where(DocumentGroupORM.id == document_id))
+            return result.scalar_one_or_none()
         except Exception as e:
             print(e)
 
-    def get_document_group_by_conversation_id(self, conversation_id):
+    async def get_document_group_by_conversation_id(self, conversation_id):
         try:
-            mapper =  self.db_session.query(ConversationDocumentGroupORM).filter(ConversationDocumentGroupORM.conversation_id == conversation_id).all()
-            result = []
-            for i in mapper:
-                result.append(self.db_session.query(DocumentGroupORM).filter(DocumentGroupORM.id == i.group_id).first())
-            return result
+            result = await self.db_session.execute(
+                select(DocumentGroupORM)
+                .join(ConversationDocumentGroupORM, ConversationDocumentGroupORM.group_id == DocumentGroupORM.id)
+                .where(ConversationDocumentGroupORM.conversation_id == conversation_id)
+            )
+            return list(result.scalars().all())
         except Exception as e:
             print(e)
 
-    def update_document_uploaded(self,group_id):
+    async def get_searchable_group_ids(self, conversation_id):
+        """IDs of the conversation's groups that hold at least one document, in one round trip."""
         try:
-            group = self.db_session.query(DocumentGroupORM).filter(DocumentGroupORM.id == group_id).one_or_none()
-            group.updated_at = datetime.now()
-            self.db_session.commit()
+            result = await self.db_session.execute(
+                select(ConversationDocumentGroupORM.group_id)
+                .where(ConversationDocumentGroupORM.conversation_id == conversation_id)
+                .where(exists().where(DocumentORM.group_id == ConversationDocumentGroupORM.group_id))
+            )
+            return list(result.scalars().all())
+        except Exception as e:
+            print(e)
+
+    async def update_document_uploaded(self,group_id):
+        try:
+            group = await self.get_document_group(group_id)
+            group.updated_at = datetime.now(timezone.utc)
+            await self.db_session.commit()
             return group
         except Exception as e:
             print(e)
 
-    def is_augmented(self,group_id)->bool | None:
+    async def update_documents_uploaded(self, group_ids):
+        """update_document_uploaded for several groups in one statement."""
+        try:
+            await self.db_session.execute(
+                update(DocumentGroupORM)
+                .where(DocumentGroupORM.id.in_(group_ids))
+                .values(updated_at=datetime.now(timezone.utc))
+                .execution_options(synchronize_session=False)
+            )
+            await self.db_session.commit()
+        except Exception as e:
+            print(e)
+
+    async def is_augmented(self,group_id)->bool | None:
         try:
-            group = self.db_session.query(DocumentGroupORM).filter(DocumentGroupORM.id == group_id).one_or_none()
+            group = await self.get_document_group(group_id)
             return group.updated_at < group.last_trained
         except Exception as e:
             print(e)
 
-    def update_document_trained(self,group_id):
+    async def update_document_trained(self,group_id):
         try:
-            group = self.db_session.query(DocumentGroupORM).filter(DocumentGroupORM.id == group_id).one_or_none()
-            group.last_trained = datetime.now()
-            self.db_session.commit()
-            return group
+            # Keep updated_at as it is: onupdate would stamp it after last_trained and
+            # is_augmented would never report the group as up to date
+            await self.db_session.execute(
+                update(DocumentGroupORM)
+                .where(DocumentGroupORM.id == group_id)
+                .values(last_trained=datetime.now(timezone.utc), updated_at=DocumentGroupORM.updated_at)
+            )
+            await self.db_session.commit()
+            return await self.get_document_group(group_id)
         except Exception as e:
-            print(e)    
\ No newline at end of file
+            print(e)
@@ -1,5 +1,7 @@
 from uuid import UUID
-from db.database_adapter import SessionLocal
+
+from sqlalchemy import delete, select
+
 from db.schema.document import DocumentORM
 from db.schema.enums import FileFormat
 
@@ -8,14 +10,33 @@ class DocumentRepo:
     def __init__(self,db):
         self.db_session = db
 
-    def upload_document(self,document_id:UUID,group_id:UUID,file_name:str,path:str,file_format:FileFormat):
-        self.db_session.add(DocumentORM(name=file_name,id=document_id,group_id=group_id,path=path,format=file_format))
-        self.db_session.commit()
+    async def upload_document(self,document_id:UUID,group_id:UUID,file_name:str,path:str,file_format:FileFormat,content_hash:str = None):
+        self.db_session.add(DocumentORM(name=file_name,id=document_id,group_id=group_id,path=path,format=file_format,content_hash=content_hash))
+        await self.db_session.commit()
+
+    async def delete_document(self,document_id : UUID):
+        deleted = await self.delete_documents([document_id])
+        return deleted[0].group_id if deleted else None
+
+    async def delete_documents(self, document_ids: list[UUID]) -> list:
+        """Deletes the documents in one statement and returns (id, group_id) of the rows that existed."""
+        result = await self.db_session.execute(
+            delete(DocumentORM)
+            .where(DocumentORM.id.in_(document_ids))
+            .returning(DocumentORM.id, DocumentORM.group_id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = list(result.all())
+        await self.db_session.commit()
+        return deleted
 
-    def delete_document(self,document_id : UUID):
-        document = self.db_session.get(DocumentORM,document_id)
-        self.db_session.delete(document)
-        self.db_session.commit()
+    async def get_document_by_group(self,group_id):
+        result = await self.db_session.execute(select(DocumentORM).where(DocumentORM.group_id == group_id))
+        return list(result.scalars().all())
 
-    def get_document_by_group(self,group_id):
-        return self.db_session.query(DocumentORM).filter(DocumentORM.group_id == group_id).all()
\ No newline at end of file
+    async def update_document_indexed(self, document_id, content_hash: str, chunk_count: int):
+        document = await self.db_session.get(DocumentORM, document_id)
+        document.content_hash = content_hash
+        document.indexed_hash = content_hash
+        document.chunk_count = chunk_count
+        await self.db_session.commit()
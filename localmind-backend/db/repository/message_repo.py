@@ -1,4 +1,5 @@
-from db.database_adapter import SessionLocal
+from sqlalchemy import select, tuple_
+
 from db.schema.message import MessageORM
 from db.schema.enums import MessageSender
 
@@ -6,22 +7,54 @@ class MessageRepo:
     def __init__(self,db):
         self.db_session = db
 
-    def get_message_by_id(self, message_id):
-        return self.db_session.query(MessageORM).filter(MessageORM.id == message_id).one_or_none()
+    async def get_message_by_id(self, message_id):
+        result = await self.db_session.execute(select(MessageORM).where(MessageORM.id == message_id))
+        return result.scalar_one_or_none()
+
+    async def get_message_page(self, conversation_id, limit: int, before: tuple = None, after: tuple = None):
+        """
+        Up to `limit` messages by (created_at, id) keyset: the newest ones before `before` (or the newest
+        overall), newest first, or with `after` the oldest ones after it, oldest first.
+        """
+        query = select(MessageORM).where(MessageORM.conversation_id == conversation_id)
+        key = tuple_(MessageORM.created_at, MessageORM.id)
+        if after:
+            query = query.where(key > tuple_(*after)).order_by(MessageORM.created_at, MessageORM.id)
+        else:
+            if before:
+                query = query.where(key < tuple_(*before))
+            query = query.order_by(MessageORM.created_at.desc(), MessageORM.id.desc())
+        result = await self.db_session.execute(query.limit(limit))
+        return list(result.scalars().all())
+
+    async def get_recent_messages(self, conversation_id, limit: int, after=None):
+        """The newest `limit` messages (created after `after`, if given), oldest first."""
+        query = select(MessageORM).where(MessageORM.conversation_id == conversation_id)
+        if after:
+            query = query.where(MessageORM.created_at > after)
+        result = await self.db_session.execute(query.order_by(MessageORM.created_at.desc()).limit(limit))
+        messages = list(result.scalars().all())
+        messages.reverse()
+        return messages
 
-    def get_message_by_conversation(self, conversation_id):
-        return self.db_session.query(MessageORM).filter(MessageORM.conversation_id == conversation_id).order_by(MessageORM.created_at).all()
+    async def get_messages_after(self, conversation_id, after=None):
+        query = select(MessageORM).where(MessageORM.conversation_id == conversation_id)
+        if after:
+            query = query.where(MessageORM.created_at > after)
+        result = await self.db_session.execute(query.order_by(MessageORM.created_at))
+        return list(result.scalars().all())
 
-    def create_message(self, conversation_id,message_text:str,role:MessageSender):
+    async def create_message(self, conversation_id,message_text:str,role:MessageSender):
         message = MessageORM(conversation_id=conversation_id,text=message_text,sender=role)
         self.db_session.add(message)
-        self.db_session.commit()
+        await self.db_session.commit()
         return message
     
-    def update_message(self, message_id: str, text: str):
-        message_obj = self.get_message_by_id(message_id)
+    async def update_message(self, message_id: str, text: str, truncated: bool = False):
+        message_obj = await self.get_message_by_id(message_id)
         if message_obj:
             message_obj.text = text
-            self.db_session.commit()
-            self.db_session.refresh(message_obj)
-        return message_obj
\ No newline at end of file
+            message_obj.truncated = truncated
+            await self.db_session.commit()
+            await self.db_session.refresh(message_obj)
+        return message_obj
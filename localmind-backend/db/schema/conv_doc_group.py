@@ -9,8 +9,9 @@ class ConversationDocumentGroupORM(Base):
     __tablename__ = 'conversation_groups'
 
     conversation_id = Column(UUID(as_uuid=True), ForeignKey('conversation.id', ondelete='CASCADE'), primary_key=True)
-    group_id = Column(UUID(as_uuid=True), ForeignKey('document_group.id', ondelete='CASCADE'), primary_key=True)
-    added_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # The primary key covers lookups by conversation_id; this covers lookups by group
+    group_id = Column(UUID(as_uuid=True), ForeignKey('document_group.id', ondelete='CASCADE'), primary_key=True, index=True)
+    added_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     # Relationships
     conversation = relationship('ConversationORM', back_populates='group_links')
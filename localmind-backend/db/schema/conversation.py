@@ -1,5 +1,5 @@
 from uuid import uuid4
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Enum, UUID
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Enum, UUID
 from sqlalchemy.orm import relationship
 from db.database_adapter import Base
 from datetime import datetime
@@ -10,17 +10,27 @@ from db.schema.enums import ConversationType
 
 class ConversationORM(Base):
     __tablename__ = "conversation"
+    # Keyset for the conversation list (most recently updated first)
+    __table_args__ = (Index("ix_conversation_updated_at_id", "updated_at", "id"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     title = Column(String, index=True)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     conv_type = Column(Enum(ConversationType),nullable=False,default=ConversationType.GENERAL)
+    # Rolling summary of the turns that fell out of the history window, and the
+    # created_at of the last message folded into it
+    summary = Column(String, nullable=True)
+    summarized_until = Column(DateTime(timezone=True), nullable=True)
 
+    # passive_deletes: the database removes children via ON DELETE CASCADE, so deleting a
+    # conversation doesn't load its messages and links first
     messages = relationship(
         "MessageORM",
         back_populates="conversation",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
-    group_links = relationship('ConversationDocumentGroupORM', back_populates='conversation', cascade="all, delete-orphan")
+    group_links = relationship('ConversationDocumentGroupORM', back_populates='conversation', cascade="all, delete-orphan",
+                               passive_deletes=True)
@@ -9,10 +9,13 @@ class DocumentORM(Base):
     __tablename__ = "document"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
-    group_id = Column(UUID(as_uuid=True), ForeignKey("document_group.id"))
+    group_id = Column(UUID(as_uuid=True), ForeignKey("document_group.id", ondelete="CASCADE"), index=True)
     name = Column(String, nullable=False)
-    uploaded_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    uploaded_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     path = Column(String, nullable=False,unique=True)
     format = Column(Enum(FileFormat), nullable=False, )
+    content_hash = Column(String, nullable=True)
+    indexed_hash = Column(String, nullable=True)
+    chunk_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     document_group = relationship("DocumentGroupORM", back_populates="document")
@@ -10,15 +10,18 @@ class DocumentGroupORM(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     name = Column(String, nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
-    last_trained = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    last_trained = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     embed_path = Column(String,nullable=True)
 
+    # passive_deletes: documents and conversation links are removed by ON DELETE CASCADE
     document = relationship(
         "DocumentORM",
         back_populates="document_group",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
-    conversation_links = relationship('ConversationDocumentGroupORM', back_populates='document_group', cascade="all, delete-orphan")
+    conversation_links = relationship('ConversationDocumentGroupORM', back_populates='document_group', cascade="all, delete-orphan",
+                                      passive_deletes=True)
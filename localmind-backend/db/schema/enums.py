@@ -13,4 +13,10 @@ class ConversationType(str, PyEnum):
 
 class MessageSender(str, PyEnum):
     ASSISTANT = "assistant",
-    USER = "user"
\ No newline at end of file
+    USER = "user"
+
+class TrainingJobStatus(str, PyEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
@@ -1,5 +1,5 @@
 from db.database_adapter import Base
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Enum, UUID
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Enum, UUID, false
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 from datetime import datetime,timezone
@@ -10,11 +10,15 @@ from db.schema.enums import MessageSender
 class MessageORM(Base):
 
     __tablename__ = "message"
+    # Every chat turn reads a conversation's messages ordered by time; id makes it the pagination keyset
+    __table_args__ = (Index("ix_message_conversation_id_created_at_id", "conversation_id", "created_at", "id"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True,default=uuid4)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey('conversation.id',ondelete="CASCADE"), nullable=False)
     text = Column(String,nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     sender = Column(Enum(MessageSender), nullable=False)
+    # The stream ended before the answer was complete (client disconnected or generation failed)
+    truncated = Column(Boolean, nullable=False, default=False, server_default=false())
 
     conversation = relationship("ConversationORM", back_populates="messages")
\ No newline at end of file
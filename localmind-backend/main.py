@@ -1,10 +1,26 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes.router import api_router
-from db.database_adapter import Base, engine
+from api.service.resource_registry import ResourceRegistry
+from db.database_adapter import engine
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema is managed by migrations: run `alembic upgrade head` before starting the app
+    resources = ResourceRegistry()
+    resources.start()
+    app.state.resources = resources
+    try:
+        yield
+    finally:
+        await resources.close()
+        await engine.dispose()
 
-Base.metadata.create_all(bind=engine)
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 
 app.include_router(api_router, prefix="/api")
@@ -15,6 +31,5 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["x-message-id", "x-user-message-id", "x-assistant-message-id"],
+    expose_headers=["x-message-id", "x-user-message-id", "x-assistant-message-id", "x-queue-position"],
 )
-
@@ -0,0 +1,97 @@
+"""Baseline: the schema Base.metadata.create_all used to build on startup
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+Databases created by the old startup code already have these tables; mark them with
+`alembic stamp 0001` and then run `alembic upgrade head`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLAlchemy stores Python enums by member name
+conversation_type = sa.Enum('GENERAL', 'RAG', 'STRICT_RAG', name='conversationtype')
+message_sender = sa.Enum('ASSISTANT', 'USER', name='messagesender')
+file_format = sa.Enum('PDF', 'TXT', 'DOC', 'DOCX', name='fileformat')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'conversation',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('title', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('conv_type', conversation_type, nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_conversation_title', 'conversation', ['title'])
+
+    op.create_table(
+        'document_group',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('last_trained', sa.DateTime(), nullable=True),
+        sa.Column('embed_path', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+    op.create_table(
+        'conversation_groups',
+        sa.Column('conversation_id', sa.UUID(), nullable=False),
+        sa.Column('group_id', sa.UUID(), nullable=False),
+        sa.Column('added_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['conversation_id'], ['conversation.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['group_id'], ['document_group.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('conversation_id', 'group_id'),
+    )
+
+    op.create_table(
+        'document',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('group_id', sa.UUID(), nullable=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+        sa.Column('path', sa.String(), nullable=False),
+        sa.Column('format', file_format, nullable=False),
+        sa.ForeignKeyConstraint(['group_id'], ['document_group.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('path'),
+    )
+
+    op.create_table(
+        'message',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('conversation_id', sa.UUID(), nullable=False),
+        sa.Column('text', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('sender', message_sender, nullable=False),
+        sa.ForeignKeyConstraint(['conversation_id'], ['conversation.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('message')
+    op.drop_table('document')
+    op.drop_table('conversation_groups')
+    op.drop_table('document_group')
+    op.drop_index('ix_conversation_title', table_name='conversation')
+    op.drop_table('conversation')
+    bind = op.get_bind()
+    for enum in (file_format, message_sender, conversation_type):
+        enum.drop(bind, checkfirst=True)
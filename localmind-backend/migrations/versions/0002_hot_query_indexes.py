@@ -0,0 +1,51 @@
+"""Columns added since the baseline and indexes for the hot queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:05:00.000000
+
+- message(conversation_id, created_at): every chat turn loads a conversation's messages
+  filtered by conversation and ordered by time.
+- document(group_id): searchable-group lookups and group document listings.
+- conversation_groups(group_id): the primary key starts with conversation_id, so lookups
+  and cascades coming from the group side need their own index.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('conversation', sa.Column('summary', sa.String(), nullable=True))
+    op.add_column('conversation', sa.Column('summarized_until', sa.DateTime(), nullable=True))
+    op.add_column('message', sa.Column('truncated', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column('document', sa.Column('content_hash', sa.String(), nullable=True))
+    op.add_column('document', sa.Column('indexed_hash', sa.String(), nullable=True))
+    op.add_column('document', sa.Column('chunk_count', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_index('ix_message_conversation_id_created_at', 'message', ['conversation_id', 'created_at'])
+    op.create_index('ix_document_group_id', 'document', ['group_id'])
+    op.create_index('ix_conversation_groups_group_id', 'conversation_groups', ['group_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_conversation_groups_group_id', table_name='conversation_groups')
+    op.drop_index('ix_document_group_id', table_name='document')
+    op.drop_index('ix_message_conversation_id_created_at', table_name='message')
+
+    op.drop_column('document', 'chunk_count')
+    op.drop_column('document', 'indexed_hash')
+    op.drop_column('document', 'content_hash')
+    op.drop_column('message', 'truncated')
+    op.drop_column('conversation', 'summarized_until')
+    op.drop_column('conversation', 'summary')
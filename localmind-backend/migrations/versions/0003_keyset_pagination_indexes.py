@@ -0,0 +1,33 @@
+"""Keyset pagination indexes for the message and conversation lists
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 11:00:00.000000
+
+The message index gains id so (created_at, id) keyset pages are read straight from it;
+it still serves every query the old (conversation_id, created_at) index did.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_message_conversation_id_created_at_id', 'message', ['conversation_id', 'created_at', 'id'])
+    op.drop_index('ix_message_conversation_id_created_at', table_name='message')
+    op.create_index('ix_conversation_updated_at_id', 'conversation', ['updated_at', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_conversation_updated_at_id', table_name='conversation')
+    op.create_index('ix_message_conversation_id_created_at', 'message', ['conversation_id', 'created_at'])
+    op.drop_index('ix_message_conversation_id_created_at_id', table_name='message')
@@ -0,0 +1,33 @@
+"""Delete a group's documents in the database when the group is deleted
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 12:00:00.000000
+
+The ORM relationships use passive_deletes, so child rows are removed by ON DELETE CASCADE
+rather than loaded and deleted one by one. message and conversation_groups already cascade;
+document.group_id did not.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_constraint('document_group_id_fkey', 'document', type_='foreignkey')
+    op.create_foreign_key('document_group_id_fkey', 'document', 'document_group', ['group_id'], ['id'],
+                          ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('document_group_id_fkey', 'document', type_='foreignkey')
+    op.create_foreign_key('document_group_id_fkey', 'document', 'document_group', ['group_id'], ['id'])
@@ -0,0 +1,46 @@
+"""Store timestamps as timestamp with time zone
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 13:00:00.000000
+
+The models write tz-aware UTC datetimes. psycopg2 accepted them for timestamp without
+time zone columns, asyncpg refuses them. Existing values are wall-clock times in the
+server's zone: the repositories wrote naive local datetime.now(), and Postgres stored
+aware values converted to the session TimeZone. They are converted from that zone.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMP_COLUMNS = {
+    'conversation': ['created_at', 'updated_at', 'summarized_until'],
+    'document_group': ['created_at', 'updated_at', 'last_trained'],
+    'conversation_groups': ['added_at'],
+    'document': ['uploaded_at'],
+    'message': ['created_at'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, type_=sa.DateTime(timezone=True),
+                            postgresql_using=f"{column} AT TIME ZONE current_setting('TimeZone')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, type_=sa.DateTime(),
+                            postgresql_using=f"{column} AT TIME ZONE current_setting('TimeZone')")
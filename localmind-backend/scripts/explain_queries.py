@@ -0,0 +1,198 @@
+"""
+Reports how Postgres plans every repository read query and checks that an index can serve each.
+
+Seeds the database from settings.DATABASE_URL inside a transaction that is rolled back at the end,
+runs each repository query, and prints the EXPLAIN plan node types of every SELECT it issued,
+as the planner chooses them with its default settings at the seeded sizes:
+
+    ok    the plan uses no sequential scan
+    seq   the planner prefers a sequential scan at these sizes (a small table); the plan it falls
+          back to with sequential scans disabled is printed below, showing an index can serve it
+    FAIL  no index can serve the query, even with sequential scans disabled
+
+The plans only hold for the seeded sizes (see the constants below); a Sort in an "ok" plan is the
+planner's choice, not an error. Exits with status 1 if any query FAILs.
+
+Run from localmind-backend after `alembic upgrade head`:
+
+    python -m scripts.explain_queries
+"""
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.database_adapter import engine
+from db.repository.conversation_repo import ConversationRepo
+from db.repository.document_group_repo import DocumentGroupRepo
+from db.repository.document_repo import DocumentRepo
+from db.repository.message_repo import MessageRepo
+from db.schema import ConversationDocumentGroupORM, ConversationORM, DocumentGroupORM, DocumentORM, MessageORM
+from db.schema.enums import ConversationType, FileFormat, MessageSender
+
+CONVERSATIONS = 200
+MESSAGES_PER_CONVERSATION = 100
+# The queries are checked against one long conversation, where a sort instead of an index walk would show
+PROBE_CONVERSATION_MESSAGES = 5000
+GROUPS = 100
+DOCUMENTS_PER_GROUP = 20
+GROUPS_PER_CONVERSATION = 2
+
+
+async def seed(db: AsyncSession) -> dict:
+    now = datetime.now(timezone.utc)
+    conversations = [
+        {"id": uuid4(), "title": f"conversation {i}", "conv_type": ConversationType.RAG,
+         "created_at": now, "updated_at": now - timedelta(minutes=i)}
+        for i in range(CONVERSATIONS)
+    ]
+    groups = [{"id": uuid4(), "name": f"group {i}"} for i in range(GROUPS)]
+    messages = [
+        {"id": uuid4(), "conversation_id": conversation["id"], "text": f"message {i}",
+         "sender": MessageSender.USER if i % 2 == 0 else MessageSender.ASSISTANT,
+         "created_at": now - timedelta(seconds=count - i)}
+        for conversation, count in zip(
+            conversations, [PROBE_CONVERSATION_MESSAGES] + [MESSAGES_PER_CONVERSATION] * (CONVERSATIONS - 1)
+        )
+        for i in range(count)
+    ]
+    documents = [
+        {"id": uuid4(), "group_id": group["id"], "name": f"document {i}.pdf",
+         "path": f"/seed/{group['id']}/{i}.pdf", "format": FileFormat.PDF}
+        for group in groups for i in range(DOCUMENTS_PER_GROUP)
+    ]
+    links = [
+        {"conversation_id": conversation["id"], "group_id": groups[(i + j) % GROUPS]["id"]}
+        for i, conversation in enumerate(conversations) for j in range(GROUPS_PER_CONVERSATION)
+    ]
+
+    await db.execute(insert(ConversationORM), conversations)
+    await db.execute(insert(DocumentGroupORM), groups)
+    await db.execute(insert(MessageORM), messages)
+    await db.execute(insert(DocumentORM), documents)
+    await db.execute(insert(ConversationDocumentGroupORM), links)
+    await db.flush()
+    for table in ("conversation", "document_group", "message", "document", "conversation_groups"):
+        await db.execute(text(f"ANALYZE {table}"))
+
+    middle = messages[PROBE_CONVERSATION_MESSAGES // 2]
+    return {
+        "conversation_id": conversations[0]["id"],
+        "updated_at": conversations[0]["updated_at"],
+        "message_id": messages[0]["id"],
+        "group_id": groups[0]["id"],
+        "document_id": documents[0]["id"],
+        "after": middle["created_at"],
+        "cursor": (middle["created_at"], middle["id"]),
+    }
+
+
+def repository_queries(db: AsyncSession, ids: dict) -> dict:
+    messages = MessageRepo(db)
+    conversations = ConversationRepo(db)
+    groups = DocumentGroupRepo(db)
+    documents = DocumentRepo(db)
+    return {
+        "MessageRepo.get_message_by_id": lambda: messages.get_message_by_id(ids["message_id"]),
+        "MessageRepo.get_message_page": lambda: messages.get_message_page(ids["conversation_id"], 51),
+        "MessageRepo.get_message_page(before)":
+            lambda: messages.get_message_page(ids["conversation_id"], 51, before=ids["cursor"]),
+        "MessageRepo.get_message_page(after)":
+            lambda: messages.get_message_page(ids["conversation_id"], 51, after=ids["cursor"]),
+        "MessageRepo.get_recent_messages": lambda: messages.get_recent_messages(ids["conversation_id"], 14),
+        "MessageRepo.get_recent_messages(after)":
+            lambda: messages.get_recent_messages(ids["conversation_id"], 14, ids["after"]),
+        "MessageRepo.get_messages_after": lambda: messages.get_messages_after(ids["conversation_id"], ids["after"]),
+        "ConversationRepo.get_conversation_page": lambda: conversations.get_conversation_page(51),
+        "ConversationRepo.get_conversation_page(before)":
+            lambda: conversations.get_conversation_page(51, (ids["updated_at"], ids["conversation_id"])),
+        "ConversationRepo.get_conversation_by_id":
+            lambda: conversations.get_conversation_by_id(ids["conversation_id"]),
+        "DocumentGroupRepo.get_document_group": lambda: groups.get_document_group(ids["group_id"]),
+        "DocumentGroupRepo.get_document_group_by_conversation_id":
+            lambda: groups.get_document_group_by_conversation_id(ids["conversation_id"]),
+        "DocumentGroupRepo.get_searchable_group_ids":
+            lambda: groups.get_searchable_group_ids(ids["conversation_id"]),
+        "DocumentRepo.get_document_by_group": lambda: documents.get_document_by_group(ids["group_id"]),
+        "DocumentRepo.get(document)": lambda: db.get(DocumentORM, ids["document_id"]),
+    }
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def describe(node: dict) -> str:
+    target = node.get("Index Name") or node.get("Relation Name")
+    return f"{node['Node Type']} ({target})" if target else node["Node Type"]
+
+
+async def explain(conn, statement: str, parameters) -> list[dict]:
+    result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+    plan = result.scalar()
+    plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+    return list(plan_nodes(plan))
+
+
+def has_seq_scan(nodes: list[dict]) -> bool:
+    return any(node["Node Type"] == "Seq Scan" for node in nodes)
+
+
+async def main() -> int:
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    failures = []
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        # Repository commits only release a savepoint; the seed data goes away with the rollback below
+        db = AsyncSession(bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False)
+        try:
+            ids = await seed(db)
+
+            for name, query in repository_queries(db, ids).items():
+                captured.clear()
+                event.listen(engine.sync_engine, "before_cursor_execute", capture)
+                try:
+                    db.expunge_all()
+                    await query()
+                finally:
+                    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+                for statement, parameters in captured:
+                    nodes = await explain(conn, statement, parameters)
+                    if not has_seq_scan(nodes):
+                        print(f"ok    {name}: {', '.join(describe(node) for node in nodes)}")
+                        continue
+
+                    await conn.execute(text("SET LOCAL enable_seqscan = off"))
+                    forced = await explain(conn, statement, parameters)
+                    await conn.execute(text("SET LOCAL enable_seqscan = on"))
+                    status = "FAIL" if has_seq_scan(forced) else "seq "
+                    if has_seq_scan(forced):
+                        failures.append(name)
+                    print(f"{status}  {name}: {', '.join(describe(node) for node in nodes)}")
+                    print(f"        without seq scans: {', '.join(describe(node) for node in forced)}")
+        finally:
+            await db.close()
+            await transaction.rollback()
+    await engine.dispose()
+
+    if failures:
+        print(f"\n{len(failures)} queries have no usable index: {', '.join(failures)}")
+        return 1
+    print("\nAn index can serve every repository query")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
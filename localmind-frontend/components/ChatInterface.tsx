@@ -21,6 +21,7 @@ export const ChatInterface: React.FC<ChatInterfaceProps> = ({
   onToggleSidebar
 }) => {
   const [messages, setMessages] = useState<Message[]>([]);
+  const [olderCursor, setOlderCursor] = useState<string | null>(null);
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
   const [conversation, setConversation] = useState<Conversation | null>(null);
@@ -37,14 +38,16 @@ export const ChatInterface: React.FC<ChatInterfaceProps> = ({
       if (!activeConversationId) {
         setConversation(null);
         setMessages([]);
+        setOlderCursor(null);
         return;
       }
       setLoading(true);
       try {
-        const msgs = await api.getMessages(activeConversationId);
+        const page = await api.getMessages(activeConversationId);
         const active = await api.getConversation(activeConversationId);
         setConversation(active);
-        setMessages(msgs);
+        setMessages(page.items);
+        setOlderCursor(page.next_cursor);
       } catch (error) {
         console.error("Failed to load chat data", error);
       } finally {
@@ -77,6 +80,15 @@ export const ChatInterface: React.FC<ChatInterfaceProps> = ({
     prevMessageCountRef.current = messages.length;
   }, [messages]);
 
+  const loadOlderMessages = async () => {
+    if (!activeConversationId || !olderCursor) return;
+    const page = await api.getMessages(activeConversationId, olderCursor);
+    // Count the prepended messages as seen so the auto-scroll effect doesn't jump to the bottom
+    prevMessageCountRef.current += page.items.length;
+    setMessages(prev => [...page.items, ...prev]);
+    setOlderCursor(page.next_cursor);
+  };
+
   const handleSend = async () => {
     // Immediate check with ref to prevent rapid multiple sends
     if (!input.trim() || !activeConversationId || loading || isProcessingRef.current) return;
@@ -260,7 +272,18 @@ export const ChatInterface: React.FC<ChatInterfaceProps> = ({
                 </div>
               </div>
             ) : (
-              messages.map((msg) => (
+              <>
+              {olderCursor && (
+                <div className="flex justify-center">
+                  <button
+                    onClick={loadOlderMessages}
+                    className="text-xs text-gray-500 dark:text-gray-400 hover:text-gray-900 dark:hover:text-white transition-colors"
+                  >
+                    Load earlier messages
+                  </button>
+                </div>
+              )}
+              {messages.map((msg) => (
                 <div
                   key={msg.id}
                   className={`flex gap-4 max-w-3xl mx-auto ${msg.sender === SenderType.USER ? 'flex-row-reverse' : ''
@@ -301,7 +324,8 @@ export const ChatInterface: React.FC<ChatInterfaceProps> = ({
                     </span>
                   </div>
                 </div>
-              ))
+              ))}
+              </>
             )}
             <div ref={messagesEndRef} />
           </div>
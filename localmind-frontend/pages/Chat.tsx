@@ -7,6 +7,7 @@ import { api } from '@/services/APIService';
 
 export const ChatPage: React.FC = () => {
     const [conversations, setConversations] = useState<Conversation[]>([]);
+    const [conversationsCursor, setConversationsCursor] = useState<string | null>(null);
     const [activeId, setActiveId] = useState<string | null>(localStorage.getItem('lastActiveConversationId'));
     const [searchTerm, setSearchTerm] = useState('');
     const [showNewChatModal, setShowNewChatModal] = useState(false);
@@ -46,8 +47,16 @@ export const ChatPage: React.FC = () => {
     }, []);
 
     const refreshList = async () => {
-        const data = await api.getConversations();
-        setConversations(data);
+        const page = await api.getConversations();
+        setConversations(page.items);
+        setConversationsCursor(page.next_cursor);
+    };
+
+    const loadMoreConversations = async () => {
+        if (!conversationsCursor) return;
+        const page = await api.getConversations(conversationsCursor);
+        setConversations(prev => [...prev, ...page.items.filter(c => !prev.some(p => p.id === c.id))]);
+        setConversationsCursor(page.next_cursor);
     };
 
     useEffect(() => {
@@ -164,6 +173,14 @@ export const ChatPage: React.FC = () => {
                                 </button>
                             </div>
                         ))}
+                        {conversationsCursor && (
+                            <button
+                                onClick={loadMoreConversations}
+                                className="w-full p-2 text-xs text-gray-500 dark:text-gray-400 hover:text-gray-900 dark:hover:text-white transition-colors"
+                            >
+                                Load more
+                            </button>
+                        )}
                     </div>
                 </div>
 
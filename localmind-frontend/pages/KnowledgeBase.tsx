@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { Navbar } from '../components/Sidebar';
 import { api } from '@/services/APIService';
-import { DocumentGroup, Document, DocFormat } from '../types';
+import { DocumentGroup, Document, DocFormat, TrainingJobStatus } from '../types';
 import { FolderPlus, FileText, Upload, BrainCircuit, Calendar, RefreshCw, MoreVertical, X, PanelLeft, Delete, Trash, Edit } from 'lucide-react';
 
 export const KnowledgeBase: React.FC = () => {
@@ -95,14 +95,20 @@ export const KnowledgeBase: React.FC = () => {
 
     const handleTrain = async () => {
         if (!selectedGroup) return;
+        const groupId = selectedGroup.id;
         setIsTraining(true);
         try {
             // await mockApi.trainGroup(selectedGroup.id);
-            await api.trainGroup(selectedGroup.id);
+            // Training runs in the background; the POST only returns the job
+            const job = await api.trainGroup(groupId);
+            const finished = job ? await api.waitForTrainingJob(job.id) : null;
+            if (finished?.status === TrainingJobStatus.FAILED) {
+                alert(`Training failed: ${finished.errors.join(', ') || 'unknown error'}`);
+            }
             await loadGroups(); // Update timestamps
             // Re-select to update view
             const updated = await api.getGroups();
-            setSelectedGroup(updated.find(g => g.id === selectedGroup.id) || null);
+            setSelectedGroup(updated.find(g => g.id === groupId) || null);
         } finally {
             setIsTraining(false);
         }
@@ -1,6 +1,9 @@
 import {
     Conversation,
     Message,
+    Page,
+    TrainingJob,
+    TrainingJobStatus,
     DocumentGroup,
     Document,
     QueryType,
@@ -25,14 +28,17 @@ async function withFallback<T>(
 export const api = {
     // --- Conversations ---
 
-    getConversations: async (): Promise<Conversation[]> => {
+    // Most recently updated first; pass the previous page's next_cursor to continue
+    getConversations: async (cursor?: string): Promise<Page<Conversation>> => {
         return withFallback(
             async () => {
-                const res = await fetch(`${API_BASE}/conversation/`);
+                const params = new URLSearchParams();
+                if (cursor) params.set('cursor', cursor);
+                const res = await fetch(`${API_BASE}/conversation/?${params}`);
                 if (!res.ok) throw new Error('Failed to fetch conversations');
                 return res.json();
             },
-            () => Promise.resolve([])
+            () => Promise.resolve({ items: [], next_cursor: null })
         );
     },
 
@@ -81,10 +87,14 @@ export const api = {
 
     // --- Messages ---
 
-    getMessages: async (conversationId: string): Promise<Message[]> => {
+    // Latest messages (oldest first); pass the previous page's next_cursor as `before` for older ones
+    getMessages: async (conversationId: string, before?: string, limit?: number): Promise<Page<Message>> => {
         return withFallback(
             async () => {
-                const res = await fetch(`${API_BASE}/chat/${conversationId}/all`,
+                const params = new URLSearchParams();
+                if (before) params.set('before', before);
+                if (limit) params.set('limit', String(limit));
+                const res = await fetch(`${API_BASE}/chat/${conversationId}/all?${params}`,
                     {
                         method: 'POST',
                         headers: { 'Content-Type': 'application/json' },
@@ -92,13 +102,12 @@ export const api = {
                     }
                 );
                 if (!res.ok) {
-                    if (res.status === 404) return [];
+                    if (res.status === 404) return { items: [], next_cursor: null };
                     throw new Error('Failed to fetch messages');
                 }
-                const data: Message[] = await res.json();
-                return data.sort((a, b) => new Date(a.created_at).getTime() - new Date(b.created_at).getTime());
+                return res.json();
             },
-            () => Promise.resolve([])
+            () => Promise.resolve({ items: [], next_cursor: null })
         );
     },
     sendMessageStream: async (
@@ -189,8 +198,8 @@ export const api = {
     pollLatestMessage: async (conversationId: string): Promise<Message | null> => {
         return withFallback(
             async () => {
-                const msgs = await api.getMessages(conversationId);
-                const last = msgs[msgs.length - 1];
+                const page = await api.getMessages(conversationId, undefined, 1);
+                const last = page.items[page.items.length - 1];
                 if (last && last.sender === 'assistant') {
                     return last;
                 }
@@ -226,16 +235,40 @@ export const api = {
         );
     },
 
-    trainGroup: async (groupId: string): Promise<void> => {
+    // Starts (or joins) the group's training job; it runs in the background, see waitForTrainingJob
+    trainGroup: async (groupId: string): Promise<TrainingJob | null> => {
         return withFallback(
             async () => {
                 const res = await fetch(`${API_BASE}/document_group/${groupId}/train`, { method: 'POST' });
                 if (!res.ok) throw new Error('Failed to train group');
+                return res.json();
             },
-            () => Promise.resolve()
+            () => Promise.resolve(null)
+        );
+    },
+
+    getTrainingJob: async (jobId: string): Promise<TrainingJob | null> => {
+        return withFallback(
+            async () => {
+                const res = await fetch(`${API_BASE}/document_group/jobs/${jobId}`);
+                if (!res.ok) throw new Error('Failed to fetch training job');
+                return res.json();
+            },
+            () => Promise.resolve(null)
         );
     },
 
+    // Polls the job until it completes or fails; null if the job can no longer be found
+    waitForTrainingJob: async (jobId: string, intervalMs: number = 1000): Promise<TrainingJob | null> => {
+        while (true) {
+            const job = await api.getTrainingJob(jobId);
+            if (!job || job.status === TrainingJobStatus.COMPLETED || job.status === TrainingJobStatus.FAILED) {
+                return job;
+            }
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+        }
+    },
+
     // --- Documents ---
 
     getDocuments: async (groupId: string): Promise<Document[]> => {
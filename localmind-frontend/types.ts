@@ -32,6 +32,13 @@ export interface Message {
   text: string;
   created_at: string; // ISO Date
   sender: SenderType;
+  truncated?: boolean;
+}
+
+// One page of a keyset-paginated listing; pass next_cursor back to get the following page
+export interface Page<T> {
+  items: T[];
+  next_cursor: string | null;
 }
 
 export interface DocumentGroup {
@@ -43,6 +50,27 @@ export interface DocumentGroup {
   embed_path: string;
 }
 
+export enum TrainingJobStatus {
+  QUEUED = 'queued',
+  RUNNING = 'running',
+  COMPLETED = 'completed',
+  FAILED = 'failed'
+}
+
+export interface TrainingJob {
+  id: string;
+  group_id: UUID;
+  status: TrainingJobStatus;
+  created_at: string; // ISO Date
+  started_at?: string | null;
+  finished_at?: string | null;
+  documents_total: number;
+  documents_processed: number;
+  chunks_processed: number;
+  eta_seconds?: number | null;
+  errors: string[];
+}
+
 export interface Document {
   id: UUID;
   group_id: UUID;